@@ -20,7 +20,7 @@ setup(
     include_package_data=True,
 
     package_data={
-        "viewx": ["datasets/*.csv"]
+        "viewx": ["datasets/*.csv", "datasets/index.json"]
     },
 
     classifiers=[
@@ -58,6 +58,7 @@ setup(
         "dash": ["dash>=2.14.0"],
         "viz": ["seaborn>=0.12.2", "plotly>=6.0.0"],
         "pdf": ["pylatex>=1.5.0"],
+        "polars": ["polars>=1.0.0"],
         "all": [
             "streamlit>=1.32.0",
             "dash>=2.14.0",
@@ -10,8 +10,8 @@ __author__ = "Emmanuel Ascendra"
 # Importar las clases principales
 from .html_engine import HTML
 from .dashboard_engine import DashBoard
-from .report_engine import Report
-from .datasets import load_dataset
+from .report_engine import Report, BuildReport, build_reports, available_compilers
+from .datasets import load_dataset, iter_dataset, list_datasets, dataset_info
 
 # Definir qué se expone cuando se hace: from statslib import *
 __all__ = [
@@ -19,8 +19,14 @@ __all__ = [
     'HTML',
     'DashBoard',
     'Report',
+    'BuildReport',
     # Funciones
-    'load_dataset'
+    'load_dataset',
+    'iter_dataset',
+    'list_datasets',
+    'dataset_info',
+    'build_reports',
+    'available_compilers'
 ]
 
 # Mensaje de bienvenida (opcional)
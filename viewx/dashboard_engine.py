@@ -5,14 +5,21 @@ from pathlib import Path
 import tempfile
 import textwrap
 import json
-from typing import List, Dict, Any, Optional, Union
+import html
+import io
+import contextlib
+import pickle
+import time
+from typing import List, Dict, Any, Optional, Union, Callable
+
+from .dashboard_runtime import FILTER_KINDS, METRIC_AGGS, infer_filter_kind, build_figure, metric_value
 
 
 class DashBoard:
     """
     DashBoard v2 (fix): Generador de apps Streamlit dinámicas con control de layout y estilo.
     - Soporta: theme, rows (cols), tabs, expanders, sidebar
-    - Componentes: title, text, table, metric, plot
+    - Componentes: title, text, table, metric, plot, filter
     """
 
     VALID_PLOTS = {"scatter", "line", "hist", "bar"}
@@ -31,7 +38,11 @@ class DashBoard:
             "card": "#0f1720"
         }
         self.custom_css: Optional[str] = None
+        # fuente incremental (ver bind_source)
+        self.source: Optional[Dict[str, Any]] = None
         self.page_config = {"layout": "wide", "initial_sidebar_state": "auto"}
+        # reducción de datos en gráficos (ver dashboard_runtime.reduce_for_plot)
+        self.plot_options = {"max_points": 5000, "webgl_threshold": 1000, "bins": None}
 
     # -----------------------------
     # Theme & Page config
@@ -56,6 +67,55 @@ class DashBoard:
         self.page_config["initial_sidebar_state"] = initial_sidebar_state
         return self
 
+    def set_plot_options(self, max_points: int = None, webgl_threshold: int = None, bins: int = None):
+        """
+        max_points: presupuesto de puntos para scatter/line (0 desactiva el downsampling).
+        webgl_threshold: a partir de cuántos puntos scatter/line se dibujan con WebGL.
+        bins: número de bins de los histogramas (None => automático).
+        """
+        if max_points is not None:
+            self.plot_options["max_points"] = int(max_points)
+        if webgl_threshold is not None:
+            self.plot_options["webgl_threshold"] = int(webgl_threshold)
+        if bins is not None:
+            self.plot_options["bins"] = int(bins)
+        return self
+
+    # -----------------------------
+    # Fuente de datos incremental
+    # -----------------------------
+    def bind_source(self, source: Union[str, Path, Callable[[], Optional[pd.DataFrame]]], interval: float = 5.0, sep: str = ","):
+        """
+        Enlaza el dashboard a una fuente que crece con el tiempo.
+
+        source: ruta a un CSV/Parquet que recibe appends, o un callable (función
+            importable a nivel de módulo) que devuelve las filas nuevas en cada llamada.
+        interval: segundos entre refrescos. Sólo se re-ejecutan los componentes
+            principales (st.fragment), no toda la app.
+
+        Con una ruta, la app lee el archivo al arrancar y luego sólo las filas
+        nuevas; con un callable, `data` es el snapshot inicial.
+        """
+        if interval <= 0:
+            raise ValueError("interval debe ser > 0")
+        if callable(source):
+            self.source = {"path": None, "reader": source, "interval": float(interval), "sep": sep}
+        else:
+            path = Path(source)
+            if path.suffix.lower() not in (".csv", ".parquet"):
+                raise ValueError(f"Extensión '{path.suffix}' no soportada para fuentes incrementales (use .csv o .parquet).")
+            self.source = {"path": str(path.resolve()), "reader": None, "interval": float(interval), "sep": sep}
+        return self
+
+    @classmethod
+    def from_source(cls, path: Union[str, Path], interval: float = 5.0, sep: str = ",", **kwargs):
+        """Crea un DashBoard a partir del contenido actual de `path` y lo enlaza a sus appends."""
+        from .dashboard_runtime import IncrementalSource
+
+        snapshot = IncrementalSource(path=str(path), sep=sep)
+        snapshot.poll()
+        return cls(snapshot.data, **kwargs).bind_source(path, interval=interval, sep=sep)
+
     # -----------------------------
     # Basic components
     # -----------------------------
@@ -85,19 +145,27 @@ class DashBoard:
         })
         return self
 
-    def add_metric(self, label: str, value: Union[str, int, float], delta: Optional[Union[str, int, float]] = None):
-        self.components.append({
-            "type": "metric",
-            "label": str(label),
-            "value": str(value),
-            "delta": None if delta is None else str(delta)
-        })
+    def add_metric(
+        self,
+        label: str,
+        value: Optional[Union[str, int, float]] = None,
+        delta: Optional[Union[str, int, float]] = None,
+        column: Optional[str] = None,
+        agg: Optional[str] = None
+    ):
+        """
+        value: valor fijo. Si se indica `agg` (y opcionalmente `column`), la métrica
+        se recalcula en cada rerun sobre los datos filtrados.
+        """
+        self.components.append(self.comp_metric(label, value, delta, column=column, agg=agg))
         return self
 
     # -----------------------------
     # Plots
     # -----------------------------
-    def add_plot(self, x: Optional[str] = None, y: Optional[str] = None, kind: str = "scatter", color: Optional[str] = None):
+    def add_plot(self, x: Optional[str] = None, y: Optional[str] = None, kind: str = "scatter", color: Optional[str] = None,
+                 max_points: Optional[int] = None, weights: Optional[str] = None):
+        """weights: sólo con kind="hist", columna cuya suma da la altura de cada barra (por defecto, conteo)."""
         kind = kind.lower()
         if kind not in self.VALID_PLOTS:
             raise ValueError(f"Tipo de gráfico '{kind}' no soportado.")
@@ -105,12 +173,16 @@ class DashBoard:
             raise ValueError(f"La columna '{x}' no existe en el DataFrame.")
         if y and y not in self.data.columns and y is not None:
             raise ValueError(f"La columna '{y}' no existe en el DataFrame.")
+        if weights and weights not in self.data.columns:
+            raise ValueError(f"La columna '{weights}' no existe en el DataFrame.")
         self.components.append({
             "type": "plot",
             "kind": kind,
             "x": x,
             "y": y,
-            "color": color or self.theme["primary"]
+            "color": color or self.theme["primary"],
+            "max_points": max_points,
+            "weights": weights
         })
         return self
 
@@ -197,6 +269,10 @@ class DashBoard:
         self.sidebar_components.append(comp)
         return self
 
+    def add_filter(self, column: str, kind: Optional[str] = None, label: Optional[str] = None, default: Optional[List[Any]] = None):
+        """Agrega un filtro interactivo al sidebar (afecta a tablas, métricas y gráficos)."""
+        return self.add_sidebar(self.comp_filter(column, kind=kind, label=label, default=default))
+
     # -----------------------------
     # Internal: component builders for user convenience
     # -----------------------------
@@ -209,11 +285,57 @@ class DashBoard:
     def comp_table(self, columns: Optional[List[str]] = None):
         return {"type": "table", "columns": columns}
 
-    def comp_plot(self, x: Optional[str], y: Optional[str], kind: str = "scatter", color: Optional[str] = None):
-        return {"type": "plot", "kind": kind, "x": x, "y": y, "color": color or self.theme["primary"]}
+    def comp_plot(self, x: Optional[str], y: Optional[str], kind: str = "scatter", color: Optional[str] = None,
+                  max_points: Optional[int] = None, weights: Optional[str] = None):
+        return {"type": "plot", "kind": kind, "x": x, "y": y, "color": color or self.theme["primary"], "max_points": max_points,
+                "weights": weights}
+
+    def comp_metric(self, label: str, value: Any = None, delta: Any = None, column: Optional[str] = None, agg: Optional[str] = None):
+        if agg is None:
+            if value is None:
+                raise ValueError("comp_metric requiere 'value' o 'agg'.")
+            return {"type": "metric", "label": str(label), "value": str(value), "delta": None if delta is None else str(delta)}
+
+        agg = agg.lower()
+        if agg not in METRIC_AGGS:
+            raise ValueError(f"Agregación '{agg}' no soportada. Use una de {sorted(METRIC_AGGS)}.")
+        if column is None and agg != "count":
+            raise ValueError(f"La agregación '{agg}' requiere 'column'.")
+        if column is not None and column not in self.data.columns:
+            raise ValueError(f"La columna '{column}' no existe en el DataFrame.")
+        return {
+            "type": "metric",
+            "label": str(label),
+            "column": column,
+            "agg": agg,
+            "delta": None if delta is None else str(delta)
+        }
 
-    def comp_metric(self, label: str, value: Any, delta: Any = None):
-        return {"type": "metric", "label": label, "value": str(value), "delta": None if delta is None else str(delta)}
+    def comp_filter(self, column: str, kind: Optional[str] = None, label: Optional[str] = None, default: Optional[List[Any]] = None):
+        """
+        kind: 'category' (multiselect), 'range' (slider numérico) o 'date' (rango de fechas).
+        Si es None se deduce del dtype de la columna.
+        """
+        if column not in self.data.columns:
+            raise ValueError(f"La columna '{column}' no existe en el DataFrame.")
+        kind = (kind or infer_filter_kind(self.data[column])).lower()
+        if kind not in FILTER_KINDS:
+            raise ValueError(f"Tipo de filtro '{kind}' no soportado. Use uno de {sorted(FILTER_KINDS)}.")
+        return {"type": "filter", "column": column, "kind": kind, "label": label or column, "default": default}
+
+    def _plot_spec(self, comp: Dict[str, Any]) -> Dict[str, Any]:
+        """Spec de un plot con las opciones de reducción del dashboard ya resueltas."""
+        max_points = comp.get("max_points")
+        return {
+            "kind": comp.get("kind", "scatter"),
+            "x": comp.get("x"),
+            "y": comp.get("y"),
+            "color": comp.get("color", self.theme["primary"]),
+            "max_points": self.plot_options["max_points"] if max_points is None else max_points,
+            "webgl_threshold": self.plot_options["webgl_threshold"],
+            "bins": self.plot_options["bins"],
+            "weights": comp.get("weights"),
+        }
 
     # -----------------------------
     # Helper: render a component dict to streamlit python source code (string)
@@ -227,15 +349,15 @@ class DashBoard:
             color = comp.get("color", self.theme["primary"])
             size = comp.get("size", "20px")
             text_align = comp.get("align", "left")
-            html = f'''st.markdown(f\"\"\"<div style="display: flex; justify-content: {text_align};"><div class="viewx-card"><h1 class="viewx-title" style="font-size:{size}; color:{color}; margin:0;">{text}</h1></div></div>\"\"\", unsafe_allow_html=True)\n'''
-            return textwrap.indent(html, prefix=pad)
+            markdown = f'''st.markdown(f\"\"\"<div style="display: flex; justify-content: {text_align};"><div class="viewx-card"><h1 class="viewx-title" style="font-size:{size}; color:{color}; margin:0;">{text}</h1></div></div>\"\"\", unsafe_allow_html=True)\n'''
+            return textwrap.indent(markdown, prefix=pad)
 
         if t == "text":
             text = comp.get("text", "")
             size = comp.get("size", "14px")
             color = comp.get("color", self.theme["text"])
-            html = f'''st.markdown(f\"\"\"<div class="viewx-card"><p class="viewx-small" style="font-size:{size}; color:{color}; margin:0;">{text}</p></div>\"\"\", unsafe_allow_html=True)\n'''
-            return textwrap.indent(html, prefix=pad)
+            markdown = f'''st.markdown(f\"\"\"<div class="viewx-card"><p class="viewx-small" style="font-size:{size}; color:{color}; margin:0;">{text}</p></div>\"\"\", unsafe_allow_html=True)\n'''
+            return textwrap.indent(markdown, prefix=pad)
 
         if t == "table":
             cols = comp.get("columns")
@@ -248,28 +370,17 @@ class DashBoard:
             label = comp.get("label", "")
             value = comp.get("value", "")
             delta = comp.get("delta")
+            if comp.get("agg"):
+                source_arg = ", _vx_source" if self.source else ""
+                value_code = f"_vx_rt.metric_value(data, {comp.get('column')!r}, {comp['agg']!r}{source_arg})"
+                delta_code = f", delta={json.dumps(delta)}" if delta is not None else ""
+                return textwrap.indent(f"st.metric({json.dumps(label)}, {value_code}{delta_code})\n", prefix=pad)
             if delta is not None:
                 return textwrap.indent(f"st.metric({json.dumps(label)}, {json.dumps(value)}, delta={json.dumps(delta)})\n", prefix=pad)
             return textwrap.indent(f"st.metric({json.dumps(label)}, {json.dumps(value)})\n", prefix=pad)
 
         if t == "plot":
-            kind = comp.get("kind", "scatter")
-            x = comp.get("x")
-            y = comp.get("y")
-            color = comp.get("color", self.theme["primary"])
-            # Build plotly code depending on kind
-            if kind == "scatter":
-                code = f"fig = px.scatter(data, x={json.dumps(x) if x else 'None'}, y={json.dumps(y) if y else 'None'})\n"
-                code += f"fig.update_traces(marker=dict(color={json.dumps(color)}))\n"
-            elif kind == "line":
-                code = f"fig = px.line(data, x={json.dumps(x) if x else 'None'}, y={json.dumps(y) if y else 'None'})\n"
-                code += f"fig.update_traces(line=dict(color={json.dumps(color)}))\n"
-            elif kind == "hist":
-                code = f"fig = px.histogram(data, x={json.dumps(x)})\n"
-                code += f"fig.update_traces(marker=dict(color={json.dumps(color)}))\n"
-            elif kind == "bar":
-                code = f"fig = px.bar(data, x={json.dumps(x) if x else 'None'}, y={json.dumps(y) if y else 'None'})\n"
-                code += f"fig.update_traces(marker=dict(color={json.dumps(color)}))\n"
+            code = f"fig = _vx_rt.build_figure(data, {self._plot_spec(comp)!r})\n"
             code += "st.plotly_chart(fig, width=\"stretch\")\n"
             return textwrap.indent(code, prefix=pad)
 
@@ -302,41 +413,124 @@ class DashBoard:
                 exp_code += self._render_component_to_code(inner, indent=4)
             return textwrap.indent(exp_code, prefix=pad)
         
+        if t == "filter":
+            spec = {k: comp.get(k) for k in ("column", "kind", "label", "default")}
+            code = f"_vx_filters[{json.dumps(comp['column'])}] = _vx_rt.filter_widget(_vx_index, {spec!r})\n"
+            return textwrap.indent(code, prefix=pad)
+
         if t == "spacer":
             height = comp.get("height", 20)
-            html = f'''st.markdown(f\"\"\"<div style="height: {height}px;"></div>\"\"\", unsafe_allow_html=True)\n'''
-            return textwrap.indent(html, prefix=pad)
+            markdown = f'''st.markdown(f\"\"\"<div style="height: {height}px;"></div>\"\"\", unsafe_allow_html=True)\n'''
+            return textwrap.indent(markdown, prefix=pad)
 
         # fallback (unknown)
         return textwrap.indent(f"# Unknown component type: {t}\n", prefix=pad)
 
     # -----------------------------
-    # Run: genera app y la ejecuta
+    # Filtros: recolección de specs
     # -----------------------------
-    def run(self, open_browser: bool = True):
-        """Genera una app temporal y la ejecuta con Streamlit."""
-        temp_dir = Path(tempfile.mkdtemp())
-        app_file = temp_dir / "viewx_app.py"
+    @staticmethod
+    def _iter_components(comps: List[Dict[str, Any]]):
+        """Recorre componentes, incluyendo los anidados en rows/tabs/expanders."""
+        for comp in comps:
+            yield comp
+            t = comp.get("type")
+            if t in ("row", "expander"):
+                yield from DashBoard._iter_components(comp.get("components", []))
+            elif t == "tabs":
+                for inner in comp.get("tabs", {}).values():
+                    yield from DashBoard._iter_components(inner)
+
+    def _filter_specs(self) -> List[Dict[str, Any]]:
+        specs = {}
+        for comp in self._iter_components(self.sidebar_components + self.components):
+            if comp.get("type") == "filter":
+                specs[comp["column"]] = {"column": comp["column"], "kind": comp["kind"]}
+        return list(specs.values())
+
+    # -----------------------------
+    # Generación del código de la app
+    # -----------------------------
+    @staticmethod
+    def _probe_name(area: str, i: int, comp: Dict[str, Any]) -> str:
+        t = comp.get("type")
+        detail = comp.get("kind") if t in ("plot", "filter") else None
+        return f"{area}[{i}]:{t}" + (f":{detail}" if detail else "")
+
+    def _data_loader_code(self, app_dir: Path) -> str:
+        """Código que carga `data` una sola vez por proceso (st.cache_resource)."""
+        # Los datos se guardan una sola vez en pickle: ni se re-parsean ni se
+        # re-indexan en cada rerun.
+        data_file = app_dir / "viewx_data.pkl"
+        if self.source is None:
+            self.data.to_pickle(data_file)
+            return textwrap.dedent(f'''\
+                # --- Load data (pickle, cargado una vez por proceso) ---
+                @st.cache_resource
+                def _vx_load_data():
+                    return pd.read_pickle({json.dumps(str(data_file))})
+
+                data = _vx_load_data()''')
+
+        sep = self.source["sep"]
+        if self.source["reader"] is not None:
+            reader_file = app_dir / "viewx_reader.pkl"
+            try:
+                reader_file.write_bytes(pickle.dumps(self.source["reader"]))
+            except (pickle.PicklingError, AttributeError, TypeError) as e:
+                raise TypeError(
+                    "La fuente debe ser una función importable a nivel de módulo "
+                    f"(no lambda ni función anidada): {e}"
+                ) from e
+            self.data.to_pickle(data_file)
+            factory = (
+                f"_vx_rt.IncrementalSource(reader=pd.read_pickle({json.dumps(str(reader_file))}), "
+                f"initial=pd.read_pickle({json.dumps(str(data_file))}))"
+            )
+        else:
+            factory = f"_vx_rt.IncrementalSource(path={json.dumps(self.source['path'])}, sep={json.dumps(sep)})"
+
+        return textwrap.dedent(f'''\
+            # --- Load data (fuente incremental: sólo se leen las filas nuevas) ---
+            @st.cache_resource
+            def _vx_load_source():
+                return {factory}
+
+            _vx_source = _vx_load_source()
+            _vx_source.poll()
+
+            def _vx_load_data():
+                return _vx_source.data
+
+            data = _vx_source.data''')
 
-        # Serializar dataframe a JSON seguro (listas)
-        df_dict = self.data.to_dict(orient="list")
-        json_str = json.dumps(df_dict, ensure_ascii=False)
+    def _build_app_code(self, app_dir: Path, probes: bool = False) -> str:
+        """
+        Escribe los datos en `app_dir` y devuelve el código fuente de la app Streamlit.
+        probes: envuelve cada componente en `_vx_rt.probe` (usado por `profile`).
+        """
+        package_root = Path(__file__).resolve().parent.parent
 
         # Page config
         layout = self.page_config.get("layout", "wide")
         sidebar_state = self.page_config.get("initial_sidebar_state", "auto")
 
+        filter_specs = self._filter_specs()
+
         # Start building app code
         code_parts = []
         
         # Imports and setup
         code_parts.append(f'''import streamlit as st\nimport pandas as pd\nimport plotly.express as px \
 \nimport json
+import sys
+
+sys.path.insert(0, {json.dumps(str(package_root))})
+from viewx import dashboard_runtime as _vx_rt
 
 st.set_page_config(page_title={json.dumps(self.title)}, layout="{layout}", initial_sidebar_state="{sidebar_state}")
 
-# --- Load data (from JSON embedded) ---
-data = pd.DataFrame(json.loads(r\'\'\'{json_str}\'\'\'))
+{self._data_loader_code(app_dir)}
 
 # --- Theme CSS injection ---
 def _inject_css():
@@ -353,6 +547,19 @@ def _inject_css():
 
 _inject_css()''')
 
+        # Filter index (construido una vez al arrancar)
+        if filter_specs:
+            code_parts.append(f'''
+# --- Filter index ---
+@st.cache_resource
+def _vx_load_index():
+    return _vx_rt.FilterIndex(_vx_load_data(), {json.dumps(filter_specs, ensure_ascii=False)})
+
+_vx_index = _vx_load_index()
+_vx_filters = {{}}''')
+            if self.source:
+                code_parts.append("_vx_index.sync(data)")
+
         # Add custom CSS if provided
         if self.custom_css:
             # Escape any triple quotes in the CSS
@@ -362,27 +569,251 @@ _inject_css()''')
         # Title of page
         code_parts.append(f'\n# Page title\nst.title({json.dumps(self.title)})\n')
 
+        apply_filters = "data = _vx_index.apply(_vx_filters)"
+
         # Sidebar components
         if self.sidebar_components:
             code_parts.append("with st.sidebar:")
-            for comp in self.sidebar_components:
-                sidebar_code = self._render_component_to_code(comp, indent=4)
+            for i, comp in enumerate(self.sidebar_components):
+                if probes:
+                    code_parts.append(f"    with _vx_rt.probe({self._probe_name('sidebar', i, comp)!r}):")
+                    sidebar_code = self._render_component_to_code(comp, indent=8)
+                else:
+                    sidebar_code = self._render_component_to_code(comp, indent=4)
                 code_parts.append(sidebar_code.rstrip())
             code_parts.append("")
+            if any(c.get("type") == "filter" for c in self._iter_components(self.sidebar_components)):
+                code_parts.append(apply_filters)
 
         # Main components rendering
         if self.components:
             code_parts.append("# Main components")
-            for comp in self.components:
-                component_code = self._render_component_to_code(comp, indent=0)
+            # Con fuente incremental, los componentes viven en un fragment que
+            # se re-ejecuta cada `interval` segundos (rerun parcial).
+            indent = 4 if self.source else 0
+            if self.source:
+                code_parts.append("def _vx_main():")
+                code_parts.append("    _vx_source.poll()")
+                if filter_specs:
+                    code_parts.append("    data = _vx_index.sync(_vx_source.data)")
+                    code_parts.append("    " + apply_filters)
+                else:
+                    code_parts.append("    data = _vx_source.data")
+            for i, comp in enumerate(self.components):
+                if probes:
+                    code_parts.append(" " * indent + f"with _vx_rt.probe({self._probe_name('main', i, comp)!r}):")
+                    component_code = self._render_component_to_code(comp, indent=indent + 4)
+                else:
+                    component_code = self._render_component_to_code(comp, indent=indent)
                 code_parts.append(component_code.rstrip())
+                if any(c.get("type") == "filter" for c in self._iter_components([comp])):
+                    code_parts.append(" " * indent + apply_filters)
+            if self.source:
+                code_parts.append(textwrap.dedent(f'''
+                    _vx_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+                    if _vx_fragment is not None:
+                        _vx_fragment(run_every={self.source["interval"]})(_vx_main)()
+                    else:
+                        _vx_main()'''))
 
         # Footer
         code_parts.append('\nst.markdown("<hr style=\\"opacity:0.2\\">", unsafe_allow_html=True)')
         code_parts.append('st.caption("Generated by ViewX DashBoard Streamlit — StreamOps tooling")')
 
         # Join all code parts
-        code = "\n".join(code_parts)
+        return "\n".join(code_parts)
+
+    # -----------------------------
+    # Static HTML: compila el dashboard sin Streamlit
+    # -----------------------------
+    def _render_component_to_html(self, comp: Dict[str, Any], ctx: Dict[str, Any]) -> str:
+        t = comp.get("type")
+        data = self.data
+
+        if t == "title":
+            size = comp.get("size", "20px")
+            color = comp.get("color", self.theme["primary"])
+            align = comp.get("align", "left")
+            return (f'<div style="display:flex; justify-content:{align};"><div class="viewx-card">'
+                    f'<h1 class="viewx-title" style="font-size:{size}; color:{color}; margin:0;">{comp.get("text", "")}</h1></div></div>')
+
+        if t == "text":
+            size = comp.get("size", "14px")
+            color = comp.get("color", self.theme["text"])
+            return (f'<div class="viewx-card"><p class="viewx-small" style="font-size:{size}; color:{color}; margin:0;">'
+                    f'{comp.get("text", "")}</p></div>')
+
+        if t == "table":
+            cols = comp.get("columns")
+            frame = data[cols] if cols else data
+            max_rows = ctx["table_max_rows"]
+            note = ""
+            if max_rows and len(frame) > max_rows:
+                note = f'<p class="viewx-small">Mostrando {max_rows:,} de {len(frame):,} filas.</p>'
+                frame = frame.head(max_rows)
+            return f'<div class="vx-table">{frame.to_html(index=False, border=0, classes="vx-df")}</div>{note}'
+
+        if t == "metric":
+            if comp.get("agg"):
+                value = metric_value(data, comp.get("column"), comp["agg"])
+            else:
+                value = comp.get("value", "")
+            delta = comp.get("delta")
+            delta_html = ""
+            if delta is not None:
+                negative = str(delta).strip().startswith(("-", "▼"))
+                delta_html = f'<div class="vx-delta {"vx-neg" if negative else "vx-pos"}">{html.escape(str(delta))}</div>'
+            return (f'<div class="vx-metric"><div class="vx-metric-label">{html.escape(str(comp.get("label", "")))}</div>'
+                    f'<div class="vx-metric-value">{html.escape(str(value))}</div>{delta_html}</div>')
+
+        if t == "plot":
+            fig = build_figure(data, self._plot_spec(comp))
+            fig.update_layout(
+                paper_bgcolor="rgba(0,0,0,0)",
+                plot_bgcolor="rgba(0,0,0,0)",
+                font=dict(color=self.theme["text"]),
+                margin=dict(l=40, r=20, t=30, b=40),
+            )
+            return fig.to_html(full_html=False, include_plotlyjs=False, config={"responsive": True}, default_height="420px")
+
+        if t == "row":
+            widths = comp.get("widths", [1])
+            cells = "".join(
+                f'<div class="vx-col" style="flex:{w} 1 0;">{self._render_component_to_html(inner, ctx)}</div>'
+                for w, inner in zip(widths, comp.get("components", []))
+            )
+            return f'<div class="vx-row">{cells}</div>'
+
+        if t == "tabs":
+            ctx["tab_group"] += 1
+            group = f"vxtabs{ctx['tab_group']}"
+            buttons, panels = [], []
+            for i, (name, inner_comps) in enumerate(comp.get("tabs", {}).items()):
+                active = " vx-active" if i == 0 else ""
+                buttons.append(f'<button class="vx-tab{active}" data-group="{group}" data-tab="{i}">{html.escape(str(name))}</button>')
+                inner = "".join(self._render_component_to_html(c, ctx) for c in inner_comps)
+                panels.append(f'<div class="vx-panel{active}" data-group="{group}" data-tab="{i}">{inner}</div>')
+            return f'<div class="vx-tabs"><div class="vx-tabbar">{"".join(buttons)}</div>{"".join(panels)}</div>'
+
+        if t == "expander":
+            open_attr = " open" if comp.get("expanded") else ""
+            inner = "".join(self._render_component_to_html(c, ctx) for c in comp.get("components", []))
+            return f'<details class="vx-expander"{open_attr}><summary>{html.escape(str(comp.get("label", "Expander")))}</summary>{inner}</details>'
+
+        if t == "spacer":
+            return f'<div style="height: {comp.get("height", 20)}px;"></div>'
+
+        if t == "filter":
+            # Sin backend no hay filtrado: se documenta el filtro como estático
+            return f'<div class="viewx-card viewx-small">{html.escape(str(comp.get("label") or comp["column"]))}: todos los valores (HTML estático)</div>'
+
+        return f"<!-- Unknown component type: {html.escape(str(t))} -->"
+
+    def to_html(self, filename: str = "dashboard.html", plotlyjs: str = "inline", table_max_rows: Optional[int] = 1000) -> str:
+        """
+        Compila el dashboard en un único archivo HTML autocontenido (sin Streamlit).
+
+        plotlyjs: 'inline' incrusta plotly.js (archivo 100% offline) o 'cdn' para enlazarlo.
+        table_max_rows: filas máximas por tabla (None => todas).
+        Los filtros se muestran como estáticos: el HTML refleja `data` completo.
+        """
+        if plotlyjs not in ("inline", "cdn"):
+            raise ValueError("plotlyjs debe ser 'inline' o 'cdn'.")
+        start = time.perf_counter()
+        ctx = {"table_max_rows": table_max_rows, "tab_group": 0}
+
+        from plotly.offline import get_plotlyjs, get_plotlyjs_version
+        if plotlyjs == "inline":
+            plotly_tag = f'<script type="text/javascript">{get_plotlyjs()}</script>'
+        else:
+            plotly_tag = f'<script src="https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js"></script>'
+
+        sidebar = "".join(self._render_component_to_html(c, ctx) for c in self.sidebar_components)
+        main = "".join(self._render_component_to_html(c, ctx) for c in self.components)
+        max_width = "none" if self.page_config.get("layout") == "wide" else "730px"
+        theme = self.theme
+
+        page = f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{html.escape(self.title)}</title>
+{plotly_tag}
+<style>
+body {{ margin:0; background-color:{theme['background']}; color:{theme['text']}; font-family:"Source Sans Pro", Arial, sans-serif; }}
+.vx-layout {{ display:flex; min-height:100vh; }}
+.vx-sidebar {{ width:280px; flex:0 0 280px; padding:24px 16px; background:{theme['card']}; box-sizing:border-box; }}
+.vx-main {{ flex:1; min-width:0; padding:24px 32px; box-sizing:border-box; }}
+.vx-main-inner {{ max-width:{max_width}; margin:0 auto; }}
+.viewx-card {{ background:{theme['card']}; padding:10px; border-radius:8px; margin-bottom:10px; }}
+.viewx-title {{ color:{theme['primary']}; font-weight:700; }}
+.viewx-small {{ color:{theme['text']}; }}
+.vx-row {{ display:flex; gap:16px; align-items:flex-start; margin-bottom:16px; }}
+.vx-col {{ min-width:0; }}
+.vx-metric {{ padding:8px 0; }}
+.vx-metric-label {{ font-size:14px; opacity:0.8; }}
+.vx-metric-value {{ font-size:36px; }}
+.vx-delta {{ font-size:14px; display:inline-block; padding:2px 8px; border-radius:12px; }}
+.vx-pos {{ color:#21c354; background:rgba(33,195,84,0.1); }}
+.vx-neg {{ color:#ff4b4b; background:rgba(255,75,75,0.1); }}
+.vx-table {{ max-height:400px; overflow:auto; margin-bottom:10px; }}
+.vx-df {{ border-collapse:collapse; width:100%; font-size:14px; }}
+.vx-df th {{ position:sticky; top:0; background:{theme['card']}; text-align:left; }}
+.vx-df th, .vx-df td {{ padding:4px 8px; border-bottom:1px solid rgba(128,128,128,0.25); }}
+.vx-tabbar {{ display:flex; gap:4px; border-bottom:1px solid rgba(128,128,128,0.3); margin-bottom:12px; }}
+.vx-tab {{ background:none; border:none; color:{theme['text']}; padding:8px 12px; cursor:pointer; border-bottom:2px solid transparent; font-size:14px; }}
+.vx-tab.vx-active {{ color:{theme['primary']}; border-bottom-color:{theme['primary']}; }}
+.vx-panel {{ display:none; }}
+.vx-panel.vx-active {{ display:block; }}
+.vx-expander {{ border:1px solid rgba(128,128,128,0.3); border-radius:8px; padding:8px 12px; margin-bottom:12px; }}
+.vx-expander summary {{ cursor:pointer; }}
+hr {{ opacity:0.2; }}
+</style>
+{f'<style>{self.custom_css}</style>' if self.custom_css else ''}
+</head>
+<body>
+<div class="vx-layout">
+{f'<aside class="vx-sidebar">{sidebar}</aside>' if sidebar else ''}
+<main class="vx-main"><div class="vx-main-inner">
+<h1>{html.escape(self.title)}</h1>
+{main}
+<hr>
+<p class="viewx-small" style="font-size:12px; opacity:0.7;">Generated by ViewX DashBoard — static HTML</p>
+</div></main>
+</div>
+<script>
+document.querySelectorAll(".vx-tab").forEach(function(btn) {{
+    btn.addEventListener("click", function() {{
+        var group = btn.dataset.group, tab = btn.dataset.tab;
+        document.querySelectorAll('[data-group="' + group + '"]').forEach(function(el) {{
+            el.classList.toggle("vx-active", el.dataset.tab === tab);
+        }});
+        // los gráficos en pestañas ocultas se dibujan con ancho 0
+        document.querySelectorAll('.vx-panel[data-group="' + group + '"].vx-active .plotly-graph-div')
+            .forEach(function(plot) {{ Plotly.Plots.resize(plot); }});
+    }});
+}});
+</script>
+</body>
+</html>
+"""
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write(page)
+
+        self.last_compile_seconds = time.perf_counter() - start
+        print(f"[ViewX] ✅ HTML estático generado: {filename} ({self.last_compile_seconds:.2f} s)")
+        return filename
+
+    # -----------------------------
+    # Run: genera app y la ejecuta
+    # -----------------------------
+    def run(self, open_browser: bool = True):
+        """Genera una app temporal y la ejecuta con Streamlit."""
+        temp_dir = Path(tempfile.mkdtemp())
+        app_file = temp_dir / "viewx_app.py"
+
+        code = self._build_app_code(temp_dir)
 
         # Write file
         app_file.write_text(code, encoding="utf-8")
@@ -405,5 +836,119 @@ _inject_css()''')
         self.process = process
         return process
 
+    # -----------------------------
+    # Profile: ejecución headless para medir rendimiento
+    # -----------------------------
+    def profile(self, reruns: int = 5, json_path: Optional[str] = None, timeout: float = 60.0,
+                measure_server_startup: bool = False) -> Dict[str, Any]:
+        """
+        Ejecuta la app generada sin navegador (streamlit.testing AppTest) `reruns` veces.
+
+        Reporta por rerun: latencia total, tiempo por componente y memoria pico
+        (tracemalloc); del último rerun, los bytes de payload por elemento.
+        Incluye además el tiempo de `to_html` y, con `measure_server_startup=True`,
+        el arranque real de `streamlit run` hasta que el servidor responde.
+        El resultado se devuelve como dict y, si se indica `json_path`, se guarda en JSON.
+        """
+        import tracemalloc
+        from streamlit.testing.v1 import AppTest
+        from . import dashboard_runtime
+
+        if reruns < 1:
+            raise ValueError("reruns debe ser >= 1")
 
+        temp_dir = Path(tempfile.mkdtemp())
+        app_file = temp_dir / "viewx_app.py"
+
+        start = time.perf_counter()
+        app_file.write_text(self._build_app_code(temp_dir, probes=True), encoding="utf-8")
+        build_seconds = time.perf_counter() - start
+
+        at = AppTest.from_file(str(app_file), default_timeout=timeout)
+        runs = []
+        for i in range(reruns):
+            dashboard_runtime.PROBE_RESULTS.clear()
+            tracemalloc.start()
+            start = time.perf_counter()
+            at.run()
+            seconds = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            if at.exception:
+                raise RuntimeError(f"[ViewX] La app falló en el rerun {i}: {at.exception[0].message}")
+            runs.append({
+                "rerun": i,
+                "seconds": seconds,
+                "peak_memory_bytes": peak,
+                "components": list(dashboard_runtime.PROBE_RESULTS),
+            })
+
+        elements = []
+        stack = [at.sidebar, at.main]
+        while stack:
+            node = stack.pop(0)
+            proto = getattr(node, "proto", None)
+            if proto is not None and hasattr(proto, "ByteSize"):
+                elements.append({"type": node.type, "payload_bytes": proto.ByteSize()})
+            stack.extend(getattr(node, "children", {}).values())
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.to_html(str(temp_dir / "viewx_static.html"))
+        html_seconds = time.perf_counter() - start
+
+        component_names = [c["component"] for c in runs[0]["components"]]
+        result = {
+            "title": self.title,
+            "rows": int(len(self.data)),
+            "columns": int(self.data.shape[1]),
+            "reruns": reruns,
+            "build_seconds": build_seconds,
+            "first_run_seconds": runs[0]["seconds"],
+            "mean_rerun_seconds": sum(r["seconds"] for r in runs[1:]) / (reruns - 1) if reruns > 1 else None,
+            "peak_memory_bytes": max(r["peak_memory_bytes"] for r in runs),
+            "components": {
+                name: {
+                    "mean_seconds": sum(c["seconds"] for r in runs for c in r["components"] if c["component"] == name) / reruns,
+                    "max_seconds": max(c["seconds"] for r in runs for c in r["components"] if c["component"] == name),
+                }
+                for name in component_names
+            },
+            "elements": elements,
+            "payload_bytes": sum(e["payload_bytes"] for e in elements),
+            "html_compile_seconds": html_seconds,
+            "server_startup_seconds": self._measure_server_startup(app_file, timeout) if measure_server_startup else None,
+            "runs": runs,
+        }
 
+        if json_path:
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump(result, f, indent=2, ensure_ascii=False, default=str)
+            print(f"[ViewX] 📊 Perfil guardado en: {json_path}")
+        return result
+
+    @staticmethod
+    def _measure_server_startup(app_file: Path, timeout: float) -> float:
+        """Segundos desde `streamlit run` hasta que /_stcore/health responde."""
+        import socket
+        import urllib.request
+
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        args = [sys.executable, "-m", "streamlit", "run", str(app_file),
+                "--server.headless=true", f"--server.port={port}"]
+        start = time.perf_counter()
+        process = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            while time.perf_counter() - start < timeout:
+                try:
+                    with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as resp:
+                        if resp.status == 200:
+                            return time.perf_counter() - start
+                except OSError:
+                    time.sleep(0.05)
+            raise TimeoutError(f"[ViewX] Streamlit no respondió en {timeout} s")
+        finally:
+            process.terminate()
+            process.wait()
@@ -0,0 +1,575 @@
+"""
+Runtime de ViewX DashBoard.
+
+Utilidades importadas por las apps de Streamlit que genera `DashBoard.run()`.
+Todo lo que aquí se construye vive en `st.cache_resource`, es decir, se crea
+una sola vez por proceso y se comparte entre reruns y sesiones.
+"""
+import io
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+FILTER_KINDS = {"category", "range", "date"}
+METRIC_AGGS = {"count", "sum", "mean", "min", "max", "median", "nunique"}
+
+
+def infer_filter_kind(series: pd.Series) -> str:
+    """Deduce el tipo de filtro a partir del dtype de la columna."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return "date"
+    if pd.api.types.is_bool_dtype(series):
+        return "category"
+    if pd.api.types.is_numeric_dtype(series):
+        return "range"
+    return "category"
+
+
+# ============================================================
+#                     ÍNDICE DE FILTROS
+# ============================================================
+class FilterIndex:
+    """
+    Índices de filtrado construidos una sola vez sobre `data`.
+
+    - category: códigos enteros (pd.factorize) + tabla de búsqueda booleana.
+    - range/date: permutación ordenada; un rango se resuelve con searchsorted.
+
+    Los resultados se guardan en un LRU indexado por el estado de los filtros,
+    así volver a un estado anterior no recalcula nada.
+    """
+
+    def __init__(self, data: pd.DataFrame, filters: List[Dict[str, Any]], cache_size: int = 64):
+        self.data = data
+        self.specs: Dict[str, Dict[str, Any]] = {f["column"]: f for f in filters}
+        self.cache_size = cache_size
+        self._categories: Dict[str, Tuple[np.ndarray, list, Dict[Any, int]]] = {}
+        self._ranges: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._cache: "OrderedDict[tuple, pd.DataFrame]" = OrderedDict()
+        # el índice se comparte entre sesiones (st.cache_resource): sync y apply
+        # leen y extienden los arrays bajo el mismo lock
+        self._lock = threading.RLock()
+        self._build()
+
+    def _build(self):
+        self._categories.clear()
+        self._ranges.clear()
+        self._cache.clear()
+        for column, spec in self.specs.items():
+            self._build_column(column, spec["kind"])
+
+    # -----------------------------
+    # Construcción
+    # -----------------------------
+    @staticmethod
+    def _sortable(series: pd.Series, kind: str) -> np.ndarray:
+        if kind == "date":
+            return pd.to_datetime(series).to_numpy(dtype="datetime64[ns]").view("i8")
+        return series.to_numpy(dtype="float64", na_value=np.nan)
+
+    def _build_column(self, column: str, kind: str):
+        series = self.data[column]
+        if kind == "category":
+            codes, uniques = pd.factorize(series, sort=True)
+            categories = uniques.tolist()
+            lookup = {c: i for i, c in enumerate(categories)}
+            self._categories[column] = (codes.astype(np.int32, copy=False), categories, lookup)
+        else:
+            values = self._sortable(series, kind)
+            order = np.argsort(values, kind="stable")
+            self._ranges[column] = (order, values[order])
+
+    # -----------------------------
+    # Actualización incremental
+    # -----------------------------
+    def sync(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Incorpora al índice las filas de `data` posteriores a las ya indexadas
+        (fuentes que sólo crecen). No reconstruye nada si no hay filas nuevas.
+        """
+        if data is self.data:
+            return data
+        with self._lock:
+            # otra sesión pudo sincronizar mientras se esperaba el lock
+            if data is self.data:
+                return data
+            n_old = len(self.data)
+            if len(data) < n_old:
+                # la fuente se truncó o rotó: reconstrucción completa
+                self.data = data
+                self._build()
+                return data
+
+            new_rows = data.iloc[n_old:]
+            for column, spec in self.specs.items():
+                if spec["kind"] == "category":
+                    self._extend_category(column, new_rows[column])
+                else:
+                    self._extend_range(column, new_rows[column], spec["kind"], n_old)
+            self.data = data
+            self._cache.clear()
+        return data
+
+    def _extend_category(self, column: str, series: pd.Series):
+        codes, categories, lookup = self._categories[column]
+        new_codes, uniques = pd.factorize(series)
+        # traducir códigos locales a códigos globales (categorías nuevas al final)
+        translate = np.empty(len(uniques) + 1, dtype=np.int32)
+        translate[-1] = -1
+        for i, value in enumerate(uniques.tolist()):
+            if value not in lookup:
+                lookup[value] = len(categories)
+                categories.append(value)
+            translate[i] = lookup[value]
+        self._categories[column] = (np.concatenate([codes, translate[new_codes]]), categories, lookup)
+
+    def _extend_range(self, column: str, series: pd.Series, kind: str, offset: int):
+        order, sorted_values = self._ranges[column]
+        values = self._sortable(series, kind)
+        new_order = np.argsort(values, kind="stable")
+        new_sorted = values[new_order]
+        # inserción ordenada (merge) en lugar de reordenar todo el índice
+        positions = np.searchsorted(sorted_values, new_sorted, side="right")
+        self._ranges[column] = (
+            np.insert(order, positions, new_order + offset),
+            np.insert(sorted_values, positions, new_sorted),
+        )
+
+    # -----------------------------
+    # Información para los widgets
+    # -----------------------------
+    def options(self, column: str) -> list:
+        return self._categories[column][1]
+
+    def bounds(self, column: str):
+        order, sorted_values = self._ranges[column]
+        kind = self.specs[column]["kind"]
+        if kind == "date":
+            valid = sorted_values[sorted_values != np.iinfo("i8").min]
+            if not len(valid):
+                return None, None
+            return (pd.Timestamp(int(valid[0])).date(), pd.Timestamp(int(valid[-1])).date())
+        valid = sorted_values[~np.isnan(sorted_values)]
+        if not len(valid):
+            return None, None
+        lo, hi = valid[0], valid[-1]
+        if pd.api.types.is_integer_dtype(self.data[column]):
+            return int(lo), int(hi)
+        return float(lo), float(hi)
+
+    # -----------------------------
+    # Aplicación de filtros
+    # -----------------------------
+    def _normalize(self, column: str, value) -> Optional[tuple]:
+        """Convierte el valor del widget en una clave hashable (None = sin filtro)."""
+        if value is None:
+            return None
+        kind = self.specs[column]["kind"]
+        if kind == "category":
+            selected = tuple(sorted(set(value), key=repr))
+            return selected or None
+        if not isinstance(value, (tuple, list)) or len(value) != 2:
+            # date_input devuelve un solo valor mientras se elige el rango
+            return None
+        lo, hi = value
+        if (lo, hi) == tuple(self.bounds(column)):
+            return None
+        return (lo, hi)
+
+    def _mask(self, column: str, key: tuple) -> np.ndarray:
+        kind = self.specs[column]["kind"]
+        if kind == "category":
+            codes, categories, lookup = self._categories[column]
+            # posición extra al final: los nulos (código -1) nunca pasan el filtro
+            table = np.zeros(len(categories) + 1, dtype=bool)
+            table[[lookup[v] for v in key if v in lookup]] = True
+            return table[codes]
+
+        order, sorted_values = self._ranges[column]
+        lo, hi = key
+        if kind == "date":
+            lo = pd.Timestamp(lo).value
+            hi = (pd.Timestamp(hi) + pd.Timedelta(days=1)).value
+            start = np.searchsorted(sorted_values, lo, side="left")
+            stop = np.searchsorted(sorted_values, hi, side="left")
+        else:
+            start = np.searchsorted(sorted_values, lo, side="left")
+            stop = np.searchsorted(sorted_values, hi, side="right")
+        mask = np.zeros(len(order), dtype=bool)
+        mask[order[start:stop]] = True
+        return mask
+
+    def apply(self, state: Dict[str, Any]) -> pd.DataFrame:
+        """Devuelve `data` filtrado según el estado actual de los widgets."""
+        key = tuple(sorted(
+            (column, norm)
+            for column, norm in ((c, self._normalize(c, v)) for c, v in state.items())
+            if norm is not None
+        ))
+        if not key:
+            return self.data
+
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+            # la máscara y `data` deben venir del mismo estado del índice
+            mask = None
+            for column, value in key:
+                m = self._mask(column, value)
+                mask = m if mask is None else (mask & m)
+            result = self.data[mask]
+            self._cache[key] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+
+# ============================================================
+#                        WIDGETS
+# ============================================================
+def filter_widget(index: FilterIndex, spec: Dict[str, Any]):
+    """Dibuja el widget de Streamlit de un filtro y devuelve su valor."""
+    import streamlit as st
+
+    column = spec["column"]
+    label = spec.get("label") or column
+    key = f"vx_filter_{column}"
+    kind = spec["kind"]
+
+    if kind == "category":
+        return st.multiselect(label, index.options(column), default=spec.get("default") or [], key=key)
+
+    lo, hi = index.bounds(column)
+    if lo is None or lo == hi:
+        st.caption(f"{label}: {lo}")
+        return None
+
+    # Si la fuente creció y el usuario no tocó el rango, el rango sigue a los nuevos límites
+    bounds_key = f"{key}__bounds"
+    previous = st.session_state.get(bounds_key)
+    if previous is not None and previous != (lo, hi) and tuple(st.session_state.get(key, ())) == previous:
+        st.session_state[key] = (lo, hi)
+    st.session_state[bounds_key] = (lo, hi)
+    value = None if key in st.session_state else (lo, hi)
+
+    if kind == "date":
+        return st.date_input(label, value=value, min_value=lo, max_value=hi, key=key)
+    return st.slider(label, min_value=lo, max_value=hi, value=value, key=key)
+
+
+def metric_value(data: pd.DataFrame, column: Optional[str], agg: str,
+                 source: Optional["IncrementalSource"] = None) -> str:
+    """
+    Calcula una métrica sobre los datos (ya filtrados) en cada rerun.
+    Si `data` es el frame completo de una fuente incremental, usa sus agregados acumulados.
+    """
+    if source is not None and data is source.data and agg in IncrementalSource.RUNNING_AGGS:
+        value = source.aggregate(column, agg)
+    elif agg == "count":
+        value = len(data) if column is None else int(data[column].count())
+    else:
+        value = data[column].agg(agg)
+    if isinstance(value, (float, np.floating)):
+        return f"{value:,.2f}"
+    return str(value)
+
+
+# ============================================================
+#                  GRÁFICOS: REDUCCIÓN DE DATOS
+# ============================================================
+def _sample_rows(n: int, max_points: int, seed: int = 0) -> np.ndarray:
+    """Muestra uniforme y reproducible de posiciones, en orden original."""
+    rng = np.random.default_rng(seed)
+    return np.sort(rng.choice(n, size=max_points, replace=False))
+
+
+def _minmax_rows(values: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Downsampling min/max por cubetas consecutivas: conserva picos y valles
+    de una serie (para gráficos de línea) con O(n) y sin ordenar.
+    """
+    n = len(values)
+    n_buckets = max(1, max_points // 2)
+    edges = np.linspace(0, n, n_buckets + 1).astype(np.int64)
+    starts = edges[:-1]
+    bucket = np.repeat(np.arange(n_buckets), np.diff(edges))
+    mins = np.fmin.reduceat(values, starts)
+    maxs = np.fmax.reduceat(values, starts)
+
+    keep = []
+    for hits in (np.flatnonzero(values == mins[bucket]), np.flatnonzero(values == maxs[bucket])):
+        _, first = np.unique(bucket[hits], return_index=True)
+        keep.append(hits[first])
+    return np.unique(np.concatenate(keep))
+
+
+def reduce_for_plot(data: pd.DataFrame, kind: str, x: Optional[str], y: Optional[str],
+                    max_points: Optional[int], bins: Optional[int] = None,
+                    weights: Optional[str] = None) -> Tuple[pd.DataFrame, bool]:
+    """
+    Reduce `data` en el proceso de Python antes de construir la figura.
+
+    - hist: histograma precalculado (numpy) o conteo por categoría. Como
+      `px.histogram(data, x=x)`, cuenta filas e ignora `y`; con `weights`
+      suma esa columna.
+    - bar: agregación por `x` (suma de `y` o conteo).
+    - scatter: muestra uniforme con semilla fija.
+    - line: min/max por cubetas para conservar la forma de la serie.
+
+    Devuelve (frame, agregado) donde `agregado` indica que el frame ya contiene
+    barras listas para `px.bar` (columnas `x` y `y`).
+    """
+    if kind == "hist":
+        series = data[x]
+        weights = data[weights] if weights else None
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            values = series.to_numpy(dtype="float64", na_value=np.nan)
+            valid = ~np.isnan(values)
+            w = None if weights is None else weights.to_numpy(dtype="float64", na_value=0.0)[valid]
+            values = values[valid]
+            if not len(values):
+                return pd.DataFrame({"x": [], "y": [], "width": []}), True
+            edges = np.histogram_bin_edges(values, bins=bins or "auto")
+            if len(edges) > 201:
+                edges = np.histogram_bin_edges(values, bins=200)
+            counts, edges = np.histogram(values, bins=edges, weights=w)
+            return pd.DataFrame({"x": (edges[:-1] + edges[1:]) / 2, "y": counts, "width": np.diff(edges)}), True
+        if weights is None:
+            counts = series.value_counts(sort=False)
+        else:
+            counts = weights.groupby(series, sort=False, observed=True).sum()
+        return pd.DataFrame({"x": counts.index, "y": counts.to_numpy()}), True
+
+    if kind == "bar" and x:
+        if y:
+            grouped = data.groupby(x, sort=False, observed=True)[y].sum()
+        else:
+            grouped = data.groupby(x, sort=False, observed=True).size()
+        return pd.DataFrame({"x": grouped.index, "y": grouped.to_numpy()}), True
+
+    n = len(data)
+    if not max_points or max_points <= 0 or n <= max_points:
+        return data, False
+
+    if kind == "line" and y and pd.api.types.is_numeric_dtype(data[y]):
+        rows = _minmax_rows(data[y].to_numpy(dtype="float64", na_value=np.nan), max_points)
+    else:
+        rows = _sample_rows(n, max_points)
+    return data.iloc[rows], False
+
+
+def build_figure(data: pd.DataFrame, spec: Dict[str, Any]):
+    """Construye la figura plotly de un componente `plot` con datos reducidos."""
+    import plotly.express as px
+
+    kind = spec.get("kind", "scatter")
+    x, y = spec.get("x"), spec.get("y")
+    color = spec.get("color")
+    frame, aggregated = reduce_for_plot(data, kind, x, y, spec.get("max_points"), spec.get("bins"),
+                                        spec.get("weights"))
+    webgl = len(frame) > (spec.get("webgl_threshold") or float("inf"))
+
+    if aggregated:
+        y_label = spec.get("weights") if kind == "hist" else y
+        fig = px.bar(frame, x="x", y="y", labels={"x": x or "", "y": y_label or "count"})
+        if "width" in frame:
+            fig.update_traces(width=frame["width"].to_numpy())
+            fig.update_layout(bargap=0)
+        fig.update_traces(marker=dict(color=color))
+    elif kind == "line":
+        fig = px.line(frame, x=x, y=y, render_mode="webgl" if webgl else "auto")
+        fig.update_traces(line=dict(color=color))
+    elif kind == "bar":
+        fig = px.bar(frame, x=x, y=y)
+        fig.update_traces(marker=dict(color=color))
+    else:
+        fig = px.scatter(frame, x=x, y=y, render_mode="webgl" if webgl else "auto")
+        fig.update_traces(marker=dict(color=color))
+    return fig
+
+
+# ============================================================
+#                  FUENTES DE DATOS INCREMENTALES
+# ============================================================
+class IncrementalSource:
+    """
+    Fuente de datos que sólo crece (CSV/Parquet que recibe appends, o un callable).
+
+    - CSV: se recuerda el offset en bytes de la última línea completa leída.
+    - Parquet: se recuerda el número de row groups ya leídos.
+    - callable: cada llamada devuelve las filas nuevas (DataFrame o None).
+
+    `poll()` lee únicamente lo nuevo, lo agrega a `data` y actualiza los
+    agregados acumulados (count/sum/mean/min/max) sin recorrer lo anterior.
+    Los bloques nuevos se guardan en una lista y sólo se concatenan al leer
+    `data`, una vez para todos los polls acumulados.
+    """
+
+    RUNNING_AGGS = {"count", "sum", "mean", "min", "max"}
+
+    def __init__(self, path: Optional[str] = None, reader: Optional[Callable[[], Optional[pd.DataFrame]]] = None,
+                 initial: Optional[pd.DataFrame] = None, sep: str = ","):
+        if (path is None) == (reader is None):
+            raise ValueError("IncrementalSource requiere 'path' o 'reader' (sólo uno).")
+        self.path = None if path is None else str(path)
+        self.reader = reader
+        self.sep = sep
+        self.ext = None if path is None else os.path.splitext(self.path)[1].lower()
+        if self.ext not in (None, ".csv", ".parquet"):
+            raise ValueError(f"Extensión '{self.ext}' no soportada para fuentes incrementales (use .csv o .parquet).")
+
+        self._lock = threading.RLock()
+        self.data = initial if initial is not None else pd.DataFrame()
+        self.version = 0
+        self._offset = 0        # CSV: bytes consumidos
+        self._row_groups = 0    # Parquet: row groups consumidos
+        self._header: Optional[List[str]] = None
+        self._aggregates: Dict[Tuple[Optional[str], str], list] = {}
+        self.last_poll = 0.0
+
+    @property
+    def data(self) -> pd.DataFrame:
+        with self._lock:
+            if len(self._frames) > 1:
+                self._frames = [pd.concat(self._frames, ignore_index=True)]
+            return self._frames[0]
+
+    @data.setter
+    def data(self, frame: pd.DataFrame):
+        with self._lock:
+            self._frames = [frame]
+
+    # -----------------------------
+    # Lectura incremental
+    # -----------------------------
+    def _read_csv_tail(self) -> Optional[pd.DataFrame]:
+        size = os.path.getsize(self.path)
+        if size < self._offset:
+            # archivo truncado o rotado: volver a empezar
+            self._reset()
+        if size == self._offset:
+            return None
+        with open(self.path, "rb") as fh:
+            fh.seek(self._offset)
+            chunk = fh.read(size - self._offset)
+        end = chunk.rfind(b"\n")
+        if end < 0:
+            return None  # línea todavía incompleta
+        chunk = chunk[:end + 1]
+        self._offset += len(chunk)
+        if self._header is None:
+            new = pd.read_csv(io.BytesIO(chunk), sep=self.sep)
+            self._header = list(new.columns)
+            return new
+        return pd.read_csv(io.BytesIO(chunk), sep=self.sep, header=None, names=self._header)
+
+    def _read_parquet_tail(self) -> Optional[pd.DataFrame]:
+        import pyarrow.parquet as pq
+
+        pf = pq.ParquetFile(self.path)
+        if pf.num_row_groups < self._row_groups:
+            self._reset()
+        if pf.num_row_groups == self._row_groups:
+            return None
+        groups = list(range(self._row_groups, pf.num_row_groups))
+        self._row_groups = pf.num_row_groups
+        return pf.read_row_groups(groups).to_pandas()
+
+    def _reset(self):
+        self.data = pd.DataFrame()
+        self._offset = 0
+        self._row_groups = 0
+        self._header = None
+        self._aggregates.clear()
+
+    def poll(self) -> bool:
+        """Lee las filas nuevas (si las hay). Devuelve True si `data` cambió."""
+        with self._lock:
+            self.last_poll = time.monotonic()
+            if self.reader is not None:
+                new = self.reader()
+            elif self.ext == ".parquet":
+                new = self._read_parquet_tail()
+            else:
+                new = self._read_csv_tail()
+            if new is None or not len(new):
+                return False
+            self._append(new)
+            return True
+
+    def _append(self, new: pd.DataFrame):
+        first = self._frames[0]
+        if len(first.columns):
+            for column in new.columns.intersection(first.columns):
+                if new[column].dtype != first[column].dtype:
+                    try:
+                        new[column] = new[column].astype(first[column].dtype)
+                    except (TypeError, ValueError):
+                        pass
+            self._frames.append(new)
+        else:
+            self._frames = [new.reset_index(drop=True)]
+        for (column, agg), state in self._aggregates.items():
+            self._merge_aggregate(state, new, column)
+        self.version += 1
+
+    # -----------------------------
+    # Agregados acumulados
+    # -----------------------------
+    @staticmethod
+    def _merge_aggregate(state: list, frame: pd.DataFrame, column: Optional[str]):
+        """state = [count, sum, min, max]"""
+        if column is None:
+            state[0] += len(frame)
+            return
+        values = frame[column]
+        count = int(values.count())
+        if not count:
+            return
+        state[0] += count
+        if pd.api.types.is_numeric_dtype(values):
+            state[1] += values.sum()
+        lo, hi = values.min(), values.max()
+        state[2] = lo if state[2] is None else min(state[2], lo)
+        state[3] = hi if state[3] is None else max(state[3], hi)
+
+    def aggregate(self, column: Optional[str], agg: str):
+        with self._lock:
+            key = (column, "running")
+            if key not in self._aggregates:
+                state = [0, 0, None, None]
+                self._merge_aggregate(state, self.data, column)
+                self._aggregates[key] = state
+            count, total, lo, hi = self._aggregates[key]
+        if agg == "count":
+            return count
+        if agg == "sum":
+            return total
+        if agg == "mean":
+            return total / count if count else float("nan")
+        return lo if agg == "min" else hi
+
+
+# ============================================================
+#                  PERFILADO (DashBoard.profile)
+# ============================================================
+PROBE_RESULTS: List[Dict[str, Any]] = []
+
+
+@contextmanager
+def probe(name: str):
+    """Mide el tiempo de ejecución de un componente de la app generada."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        PROBE_RESULTS.append({"component": name, "seconds": time.perf_counter() - start})
@@ -1,6 +1,15 @@
 from typing import Optional, Union, Literal, List, Tuple
 import io
+import os
+import glob
+import sys
+import json
+import time
+import hashlib
+import queue
 import pkgutil
+import threading
+from collections import OrderedDict
 from pathlib import Path
 import pandas as pd
 import numpy as np
@@ -10,12 +19,27 @@ from numpy.typing import NDArray
 _SUPPORTED_BACKENDS = ("pandas", "polars")
 
 
+def _polars():
+    try:
+        import polars as pl
+    except ImportError as e:
+        raise ImportError("El backend 'polars' requiere polars: pip install polars") from e
+    return pl
+
+
+def _column_names(df) -> List[str]:
+    pl = sys.modules.get("polars")
+    if pl is not None and isinstance(df, pl.LazyFrame):
+        return df.collect_schema().names()
+    return list(df.columns)
+
+
 def _validate_columns(
     df: pd.DataFrame,  # 输入的数据框，可以是pandas或polars DataFrame
     X_columns: List[str],  # 特征列名列表
     y_column: str  # 目标列名
 ) -> None:  # 无返回值，函数仅用于验证
-    columns = set(df.columns)
+    columns = set(_column_names(df))
     missing = set(X_columns + [y_column]) - columns
     if missing:
         raise ValueError(f"Columnas no encontradas en el dataset: {missing}")
@@ -24,76 +48,1052 @@ def _validate_columns(
 def _X_y(
     df: pd.DataFrame,
     X_columns: List[str],
-    y_column: str
+    y_column: str,
+    dtype=None
 ) -> Tuple[NDArray, NDArray]:
     """
     Extrae X e y como arrays numpy desde pandas o polars.
+    X se devuelve C-contiguo (filas contiguas) y con `dtype` si se indica.
     """
     _validate_columns(df, X_columns, y_column)
 
     if isinstance(df, pd.DataFrame):
-        X = df[X_columns].to_numpy()
+        X = np.ascontiguousarray(df[X_columns].to_numpy(dtype=dtype))
         y = df[y_column].to_numpy().ravel()
         return X, y
 
-    else:
-        raise TypeError(
-            "Backend no soportado. Use pandas.DataFrame"
-        )
+    pl = sys.modules.get("polars")
+    if pl is not None and isinstance(df, pl.DataFrame):
+        # y sin copia si es numérica y sin nulos; X sale de polars en orden Fortran
+        X = np.ascontiguousarray(df.select(X_columns).to_numpy(), dtype=dtype)
+        y = df.get_column(y_column).to_numpy()
+        return X, y
 
+    raise TypeError(
+        "Backend no soportado. Use pandas.DataFrame o polars.DataFrame"
+    )
 
-import io
-import pkgutil
-import pandas as pd
-from typing import Literal, Optional, Tuple, List, Union
-from numpy.typing import NDArray
 
-_SUPPORTED_BACKENDS = {"pandas"}
-_SUPPORTED_EXTENSIONS = {".csv", ".parquet", ".xlsx", ".xls", ".json"}
+_SUPPORTED_EXTENSIONS = {".csv", ".parquet", ".xlsx", ".xls", ".json", ".jsonl"}
 
 def _read_file(
     buffer_or_path,
     ext: str,
     backend: str,
     sep: str,
+    columns: Optional[List[str]] = None,
+    dtypes: Optional[dict] = None,
+    optimize_memory: bool = False,
 ):
     if backend == "pandas":
         if ext == ".csv":
-            return pd.read_csv(buffer_or_path, sep=sep)
+            if optimize_memory:
+                return _read_csv_compact(buffer_or_path, sep, columns, dtypes)
+            return pd.read_csv(buffer_or_path, sep=sep, usecols=columns, dtype=dtypes)
         if ext == ".parquet":
-            return pd.read_parquet(buffer_or_path)
-        if ext in {".xlsx", ".xls"}:
-            return pd.read_excel(buffer_or_path)
-        if ext == ".json":
-            return pd.read_json(buffer_or_path)
+            df = pd.read_parquet(buffer_or_path, columns=columns)
+        elif ext in {".xlsx", ".xls"}:
+            df = pd.read_excel(buffer_or_path, usecols=columns, dtype=dtypes)
+        elif ext in {".json", ".jsonl"}:
+            df = pd.read_json(buffer_or_path, lines=ext == ".jsonl")
+            df = df[columns] if columns is not None else df
+        else:
+            raise ValueError(f"Extensión '{ext}' no soportada para backend '{backend}'.")
+        if dtypes and ext != ".xlsx" and ext != ".xls":
+            df = df.astype(dtypes)
+        return _compact_frame(df, dtypes) if optimize_memory else df
 
     raise ValueError(f"Extensión '{ext}' no soportada para backend '{backend}'.")
 
+
+# =========================
+# Optimización de memoria
+# =========================
+# Se decide un plan por columna con el primer bloque leído y se aplica a cada
+# bloque al parsearlo: nunca se materializa la tabla con int64/float64/object.
+
+_CHUNK_ROWS = 100_000
+_CATEGORY_RATIO = 0.5  # proporción máxima de valores únicos para usar 'category'
+
+
+def _column_plan(df: pd.DataFrame, fixed) -> dict:
+    plan = {}
+    for col in df.columns:
+        if fixed and col in fixed:
+            continue
+        values = df[col]
+        if pd.api.types.is_bool_dtype(values):
+            continue
+        if pd.api.types.is_integer_dtype(values):
+            plan[col] = "int"
+        elif pd.api.types.is_float_dtype(values):
+            plan[col] = "float"
+        elif pd.api.types.is_object_dtype(values) or pd.api.types.is_string_dtype(values):
+            if values.nunique(dropna=True) <= _CATEGORY_RATIO * max(len(values), 1):
+                plan[col] = "category"
+    return plan
+
+
+def _compact_column(values: pd.Series, kind: str) -> pd.Series:
+    if kind == "category":
+        return values.astype("category")
+    if kind == "int" and pd.api.types.is_integer_dtype(values):
+        if len(values) == 0:
+            return values
+        return pd.to_numeric(values, downcast="unsigned" if values.min() >= 0 else "integer")
+    if pd.api.types.is_float_dtype(values):
+        # float32 sólo si no se pierde precisión
+        compact = values.astype("float32")
+        if np.array_equal(compact.to_numpy(dtype="float64"), values.to_numpy(dtype="float64"), equal_nan=True):
+            return compact
+    return values
+
+
+def _apply_plan(df: pd.DataFrame, plan: dict) -> pd.DataFrame:
+    for col, kind in plan.items():
+        df[col] = _compact_column(df[col], kind)
+    return df
+
+
+def _concat_compact(chunks: List[pd.DataFrame], plan: dict) -> pd.DataFrame:
+    if len(chunks) == 1:
+        return chunks[0]
+    for col, kind in plan.items():
+        if kind == "category":
+            # categorías comunes para que concat no vuelva a object
+            categories = pd.api.types.union_categoricals([c[col] for c in chunks]).categories
+            for c in chunks:
+                c[col] = c[col].cat.set_categories(categories)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def _memory_report(before: int, df: pd.DataFrame, plan: dict) -> dict:
+    after = int(df.memory_usage(deep=True).sum())
+    return {
+        "before_bytes": before,
+        "after_bytes": after,
+        "ratio": before / after if after else None,
+        "dtypes": {col: str(df[col].dtype) for col in plan if col in df.columns},
+    }
+
+
+def _read_csv_compact(source, sep: str, columns=None, dtypes=None) -> pd.DataFrame:
+    """CSV por bloques, compactando cada bloque al parsearlo."""
+    plan, chunks, before = None, [], 0
+    with pd.read_csv(source, sep=sep, usecols=columns, dtype=dtypes, chunksize=_CHUNK_ROWS) as reader:
+        for chunk in reader:
+            before += int(chunk.memory_usage(deep=True).sum())
+            if plan is None:
+                plan = _column_plan(chunk, dtypes)
+            chunks.append(_apply_plan(chunk, plan))
+    if not chunks:
+        # sin filas: se relee sólo la cabecera (el buffer ya se consumió)
+        if hasattr(source, "seek"):
+            source.seek(0)
+        return pd.read_csv(source, sep=sep, usecols=columns, dtype=dtypes)
+    df = _concat_compact(chunks, plan)
+    df.attrs["memory_report"] = _memory_report(before, df, plan)
+    return df
+
+
+def _compact_frame(df: pd.DataFrame, dtypes=None) -> pd.DataFrame:
+    """Compacta un DataFrame ya leído (formatos sin lectura por bloques)."""
+    before = int(df.memory_usage(deep=True).sum())
+    plan = _column_plan(df, dtypes)
+    df = _apply_plan(df.copy(), plan)
+    df.attrs["memory_report"] = _memory_report(before, df, plan)
+    return df
+
+
+def _read_source(name: str, ext: str, backend: str, sep: str, columns: Optional[List[str]] = None,
+                 dtypes: Optional[dict] = None, optimize_memory: bool = False):
+    """Lee `name` desde el paquete o, si no está ahí, desde la ruta local."""
+    path = Path(name)
+
+    # 1️⃣ Intentar cargar desde el paquete
+    try:
+        data_bytes = pkgutil.get_data("viewx.datasets", path.name)
+
+        if data_bytes is not None:
+            buffer = io.BytesIO(data_bytes)
+            return _read_file(buffer, ext, backend, sep, columns, dtypes, optimize_memory)
+    except FileNotFoundError:
+        pass
+
+    # 2️⃣ Intentar cargar desde ruta local
+    if not path.exists():
+        raise FileNotFoundError(
+            f"Dataset '{name}' no encontrado "
+            f"ni en viewx.datasets ni en la ruta local."
+        )
+    return _read_file(path, ext, backend, sep, columns, dtypes, optimize_memory)
+
+
+def _open_source(name: str) -> Union[Path, io.BytesIO]:
+    """Ruta del dataset (paquete primero, luego local) o sus bytes si el paquete está comprimido."""
+    path = Path(name)
+    bundled = Path(__file__).with_name(path.name)
+    source = bundled if bundled.is_file() else path
+    if source.is_file():
+        return source
+    try:
+        data_bytes = pkgutil.get_data("viewx.datasets", path.name)
+    except FileNotFoundError:
+        data_bytes = None
+    if data_bytes is None:
+        raise FileNotFoundError(
+            f"Dataset '{name}' no encontrado "
+            f"ni en viewx.datasets ni en la ruta local."
+        )
+    return io.BytesIO(data_bytes)
+
+
+_POLARS_DTYPES = {
+    "int8": "Int8", "int16": "Int16", "int32": "Int32", "int64": "Int64",
+    "uint8": "UInt8", "uint16": "UInt16", "uint32": "UInt32", "uint64": "UInt64",
+    "float32": "Float32", "float64": "Float64", "bool": "Boolean",
+    "category": "Categorical", "object": "String", "str": "String", "string": "String",
+}
+
+
+def _polars_dtypes(dtypes: Optional[dict]) -> Optional[dict]:
+    """Traduce tipos al estilo pandas ("int8", np.float32, "category") a tipos de polars."""
+    if not dtypes:
+        return dtypes
+    pl = _polars()
+    mapped = {}
+    for column, dtype in dtypes.items():
+        if isinstance(dtype, str) or isinstance(dtype, type) and issubclass(dtype, np.generic):
+            key = dtype if dtype in _POLARS_DTYPES else np.dtype(dtype).name
+            if key not in _POLARS_DTYPES:
+                raise ValueError(f"Tipo '{dtype}' de la columna '{column}' no tiene equivalente en polars.")
+            dtype = getattr(pl, _POLARS_DTYPES[key])
+        mapped[column] = dtype
+    return mapped
+
+
+def _scan_polars(name: str, ext: str, sep: str, dtypes: Optional[dict] = None):
+    """LazyFrame de polars sobre el dataset: nada se lee hasta `collect()`."""
+    pl = _polars()
+    dtypes = _polars_dtypes(dtypes)
+    source = _open_source(name)
+    # paquete instalado comprimido: sólo hay bytes, sin lectura perezosa
+    lazy = isinstance(source, Path)
+    if ext == ".csv":
+        if lazy:
+            return pl.scan_csv(source, separator=sep, schema_overrides=dtypes)
+        return pl.read_csv(source, separator=sep, schema_overrides=dtypes).lazy()
+    if ext == ".parquet":
+        lf = pl.scan_parquet(source) if lazy else pl.read_parquet(source).lazy()
+    # Excel/JSON no tienen lector perezoso: se leen con pandas (mismo formato que el backend pandas)
+    elif ext in {".xlsx", ".xls"}:
+        lf = pl.from_pandas(pd.read_excel(source)).lazy()
+    elif ext == ".jsonl":
+        lf = pl.scan_ndjson(source) if lazy else pl.read_ndjson(source).lazy()
+    else:
+        lf = pl.from_pandas(pd.read_json(source)).lazy()
+    if dtypes:
+        lf = lf.with_columns([pl.col(c).cast(t) for c, t in dtypes.items()])
+    return lf
+
+
+# =========================
+# Lectura por bloques
+# =========================
+
+_END = object()
+
+
+class _ReadError:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def _prefetch(make_chunks, prefetch: int):
+    """
+    Ejecuta el generador `make_chunks()` en un hilo, con hasta `prefetch`
+    bloques leídos por adelantado: el parseo se solapa con el trabajo del
+    consumidor y la memoria queda acotada.
+    """
+    if prefetch <= 0:
+        yield from make_chunks()
+        return
+
+    chunks = queue.Queue(maxsize=prefetch)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                chunks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def worker():
+        try:
+            for chunk in make_chunks():
+                if not put(chunk):
+                    return
+        except BaseException as e:
+            put(_ReadError(e))
+            return
+        put(_END)
+
+    thread = threading.Thread(target=worker, name="viewx-iter-dataset", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = chunks.get()
+            if item is _END:
+                return
+            if isinstance(item, _ReadError):
+                raise item.error
+            yield item
+    finally:
+        # el consumidor puede cortar antes (break): el hilo termina solo
+        stop.set()
+
+
+def _csv_chunks(source, sep, chunksize, columns, dtypes, as_arrow):
+    if not as_arrow:
+        with pd.read_csv(source, sep=sep, usecols=columns, dtype=dtypes, chunksize=chunksize) as reader:
+            yield from reader
+        return
+
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    reader = pa_csv.open_csv(
+        source,
+        parse_options=pa_csv.ParseOptions(delimiter=sep),
+        convert_options=pa_csv.ConvertOptions(include_columns=columns, column_types=dtypes),
+    )
+    # los bloques de pyarrow van por bytes: se reagrupan en `chunksize` filas (sin copia)
+    pending = None
+    for batch in reader:
+        table = pa.Table.from_batches([batch])
+        pending = table if pending is None else pa.concat_tables([pending, table])
+        while pending.num_rows >= chunksize:
+            yield pending.slice(0, chunksize)
+            pending = pending.slice(chunksize)
+    if pending is not None and pending.num_rows:
+        yield pending
+
+
+def _parquet_chunks(source, chunksize, columns, as_arrow):
+    import pyarrow.parquet as pq
+
+    parquet = pq.ParquetFile(source)
+    if chunksize is None:
+        # un bloque por row group
+        batches = (parquet.read_row_group(i, columns=columns) for i in range(parquet.num_row_groups))
+    else:
+        batches = parquet.iter_batches(batch_size=chunksize, columns=columns)
+    for batch in batches:
+        yield batch if as_arrow else batch.to_pandas()
+
+
+def _jsonl_chunks(source, chunksize, columns, dtypes, as_arrow):
+    with pd.read_json(source, lines=True, chunksize=chunksize, dtype=dtypes) as reader:
+        for chunk in reader:
+            if columns is not None:
+                chunk = chunk[columns]
+            if as_arrow:
+                import pyarrow as pa
+                chunk = pa.Table.from_pandas(chunk, preserve_index=False)
+            yield chunk
+
+
+def iter_dataset(
+        name: str,
+        chunksize: Optional[int] = None,
+        columns: Optional[List[str]] = None,
+        sep: str = ",",
+        dtypes: Optional[dict] = None,
+        as_arrow: bool = False,
+        prefetch: int = 2
+    ):
+    """
+    Recorre un dataset por bloques sin cargarlo completo.
+
+    Soporta CSV, Parquet y JSON-lines (.jsonl). La lectura corre en un hilo
+    con hasta `prefetch` bloques por adelantado, así que la memoria no
+    depende del tamaño del archivo.
+
+    Parámetros
+    ----------
+    name : str
+        Dataset interno o ruta local.
+    chunksize : int, optional
+        Filas por bloque. Por defecto 100 000; en Parquet, un bloque por
+        row group.
+    columns : list[str], optional
+        Columnas a leer.
+    dtypes : dict, optional
+        Tipos por columna aplicados al parsear (CSV y JSON-lines).
+    as_arrow : bool, default=False
+        Devuelve tablas/batches de pyarrow en lugar de DataFrames.
+    prefetch : int, default=2
+        Bloques leídos por adelantado (0 = sin hilo de lectura).
+
+    Retorna
+    -------
+    Generador de DataFrame (o pyarrow.Table / RecordBatch)
+    """
+    ext = Path(name).suffix.lower()
+    if ext not in {".csv", ".parquet", ".jsonl"}:
+        raise ValueError(
+            f"iter_dataset no soporta '{ext}'. Use .csv, .parquet o .jsonl."
+        )
+    source = _open_source(name)
+    if isinstance(source, Path):
+        source = str(source)
+
+    def make_chunks():
+        if ext == ".parquet":
+            return _parquet_chunks(source, chunksize, columns, as_arrow)
+        rows = chunksize or _CHUNK_ROWS
+        if ext == ".csv":
+            return _csv_chunks(source, sep, rows, columns, dtypes, as_arrow)
+        return _jsonl_chunks(source, rows, columns, dtypes, as_arrow)
+
+    return _prefetch(make_chunks, prefetch)
+
+
+# =========================
+# Muestreo
+# =========================
+# Se aplica sobre la lectura por bloques: una pasada y memoria acotada por
+# el tamaño de la muestra (no por el del archivo).
+
+_SAMPLE_METHODS = {"random", "head", "tail", "stratified"}
+
+
+def _sample_spec(sample) -> dict:
+    if isinstance(sample, bool):
+        raise TypeError("sample debe ser int, float o dict")
+    if isinstance(sample, (int, np.integer)):
+        spec = {"n": int(sample)}
+    elif isinstance(sample, float):
+        spec = {"frac": sample}
+    elif isinstance(sample, dict):
+        spec = dict(sample)
+    else:
+        raise TypeError("sample debe ser int, float o dict")
+
+    spec.setdefault("method", "stratified" if "by" in spec else "random")
+    spec.setdefault("seed", 42)
+    if spec["method"] not in _SAMPLE_METHODS:
+        raise ValueError(f"Método de muestreo no soportado: {spec['method']}. Use uno de {_SAMPLE_METHODS}.")
+    if ("n" in spec) == ("frac" in spec):
+        raise ValueError("sample necesita 'n' o 'frac' (sólo uno).")
+    if "n" in spec and spec["n"] <= 0:
+        raise ValueError("sample['n'] debe ser positivo.")
+    if "frac" in spec and not 0 < spec["frac"] <= 1:
+        raise ValueError("sample['frac'] debe estar en (0, 1].")
+    if spec["method"] in ("head", "tail") and "n" not in spec:
+        raise ValueError(f"sample '{spec['method']}' requiere 'n'.")
+    if spec["method"] == "stratified" and "by" not in spec:
+        raise ValueError("sample 'stratified' requiere 'by'.")
+    return spec
+
+
+def _keep_smallest(frame: pd.DataFrame, keys: NDArray, n: int):
+    if len(frame) <= n:
+        return frame, keys
+    idx = np.argpartition(keys, n - 1)[:n]
+    return frame.iloc[idx], keys[idx]
+
+
+def _largest_remainder(counts: dict, total: int) -> dict:
+    """Reparte `total` filas entre los grupos en proporción a `counts` (mayor resto)."""
+    rows = sum(counts.values())
+    if not rows:
+        return {}
+    quotas = {g: total * c / rows for g, c in counts.items()}
+    alloc = {g: int(q) for g, q in quotas.items()}
+    for g in sorted(quotas, key=lambda g: quotas[g] - alloc[g], reverse=True)[:total - sum(alloc.values())]:
+        alloc[g] += 1
+    return alloc
+
+
+def _group_positions(chunk: pd.DataFrame, by: str) -> dict:
+    values = chunk[by]
+    return values.groupby(values, sort=False, observed=True, dropna=False).indices
+
+
+def _sample_chunks(chunks, spec: dict, quotas: Optional[dict] = None) -> pd.DataFrame:
+    """
+    - head/tail: primeras/últimas n filas.
+    - frac: Bernoulli por fila.
+    - n: reservoir con claves aleatorias (se quedan las n claves menores,
+      una muestra uniforme sin reemplazo).
+    - stratified: un reservoir por grupo. Con n, cada grupo guarda n filas y
+      al final n se reparte en proporción al tamaño de cada grupo (mayor
+      resto); con frac, `quotas` trae ese reparto ya calculado (conteo previo
+      de la columna `by`), así que cada grupo guarda sólo su cuota.
+    """
+    rng = np.random.default_rng(spec["seed"])
+    method, n, frac = spec["method"], spec.get("n"), spec.get("frac")
+    parts, kept, keys = [], None, None
+    groups, counts = {}, {}
+    offset = taken = 0
+
+    for chunk in chunks:
+        # índice = número de fila en el archivo
+        chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+        offset += len(chunk)
+
+        if method == "head":
+            part = chunk.iloc[:n - taken]
+            parts.append(part)
+            taken += len(part)
+            if taken >= n:
+                break
+        elif method == "tail":
+            kept = chunk if kept is None else pd.concat([kept, chunk])
+            kept = kept.iloc[-n:]
+        elif method == "random" and frac is not None:
+            parts.append(chunk[rng.random(len(chunk)) < frac])
+        elif method == "random":
+            chunk_keys = rng.random(len(chunk))
+            if kept is not None:
+                chunk, chunk_keys = pd.concat([kept, chunk]), np.concatenate([keys, chunk_keys])
+            kept, keys = _keep_smallest(chunk, chunk_keys, n)
+        else:
+            chunk_keys = rng.random(len(chunk))
+            for group, positions in _group_positions(chunk, spec["by"]).items():
+                counts[group] = counts.get(group, 0) + len(positions)
+                size = n if quotas is None else quotas.get(group, 0)
+                if not size:
+                    continue
+                rows, group_keys = chunk.iloc[positions], chunk_keys[positions]
+                if group in groups:
+                    old_rows, old_keys = groups[group]
+                    rows, group_keys = pd.concat([old_rows, rows]), np.concatenate([old_keys, group_keys])
+                groups[group] = _keep_smallest(rows, group_keys, size)
+
+    if method == "tail" or (method == "random" and frac is None):
+        return kept.sort_index() if kept is not None else pd.DataFrame()
+    if method == "stratified":
+        alloc = quotas if quotas is not None else _largest_remainder(counts, min(n, sum(counts.values())))
+        parts = [_keep_smallest(*groups[g], min(alloc[g], len(groups[g][0])))[0] for g in groups if alloc.get(g)]
+    if not parts:
+        return pd.DataFrame()
+    return pd.concat(parts).sort_index()
+
+
+def _source_chunks(name: str, ext: str, sep: str, columns=None, dtypes=None, spec=None):
+    if ext in {".csv", ".parquet", ".jsonl"}:
+        chunksize = None
+        if spec["method"] == "head":
+            chunksize = min(spec["n"], _CHUNK_ROWS)  # no parsear de más
+        elif ext != ".parquet":
+            chunksize = _CHUNK_ROWS
+        return iter_dataset(name, chunksize=chunksize, columns=columns, sep=sep, dtypes=dtypes)
+    return iter([_read_source(name, ext, "pandas", sep, columns, dtypes)])
+
+
+def _sampled_read(name: str, ext: str, sep: str, columns=None, dtypes=None, spec=None,
+                  sources: Optional[List[str]] = None, provenance: Optional[str] = None) -> pd.DataFrame:
+    def chunks(columns):
+        if sources is None:
+            yield from _source_chunks(name, ext, sep, columns, dtypes, spec)
+            return
+        # los archivos se recorren en orden, como un único flujo de filas
+        for source in sources:
+            for chunk in _source_chunks(source, Path(source).suffix.lower(), sep, columns, dtypes, spec):
+                if provenance:
+                    chunk[provenance] = source
+                yield chunk
+
+    quotas = None
+    if spec["method"] == "stratified" and "frac" in spec:
+        # primera pasada sólo con la columna `by`: tamaño exacto de cada estrato
+        by = spec["by"]
+        counts = {}
+        for chunk in chunks(columns if by == provenance else [by]):
+            for group, positions in _group_positions(chunk, by).items():
+                counts[group] = counts.get(group, 0) + len(positions)
+        quotas = _largest_remainder(counts, round(spec["frac"] * sum(counts.values())))
+
+    df = _sample_chunks(chunks(columns), spec, quotas)
+    if provenance and provenance in df.columns:
+        df[provenance] = pd.Categorical(df[provenance], categories=sources)
+    return df
+
+
+# =========================
+# Varios archivos
+# =========================
+# Un glob ("ventas/*.csv") o un directorio se leen como un solo dataset: un
+# archivo por tarea en un pool de hilos (el parser de pyarrow libera el GIL),
+# esquemas unificados y concatenación Arrow sin copiar los bloques.
+
+_GLOB_CHARS = set("*?[")
+
+
+def _expand_sources(name: str) -> Optional[List[str]]:
+    """Archivos de un glob o directorio (ordenados); None si `name` es un único archivo."""
+    # un archivo que existe (o del paquete) nunca se interpreta como glob: "datos[1].csv"
+    if Path(name).is_file() or Path(__file__).with_name(Path(name).name).is_file():
+        return None
+    if _GLOB_CHARS & set(str(name)):
+        files = [f for f in sorted(glob.glob(str(name), recursive=True)) if Path(f).is_file()]
+    elif Path(name).is_dir():
+        files = [str(f) for f in sorted(Path(name).iterdir())
+                 if f.is_file() and f.suffix.lower() in _SUPPORTED_EXTENSIONS]
+    else:
+        return None
+    if not files:
+        raise FileNotFoundError(f"Ningún archivo coincide con '{name}'.")
+    unsupported = sorted({Path(f).suffix.lower() for f in files} - set(_SUPPORTED_EXTENSIONS))
+    if unsupported:
+        raise ValueError(
+            f"Extensiones no soportadas en '{name}': {unsupported}. "
+            f"Soportadas: {_SUPPORTED_EXTENSIONS}"
+        )
+    return files
+
+
+def _read_arrow(path: str, sep: str, columns=None, use_threads: bool = False):
+    """Lee un archivo como pyarrow.Table (las columnas ausentes se omiten)."""
+    import pyarrow as pa
+
+    ext = Path(path).suffix.lower()
+    if ext == ".csv":
+        from pyarrow import csv as pa_csv
+        return pa_csv.read_csv(
+            path,
+            read_options=pa_csv.ReadOptions(use_threads=use_threads),
+            parse_options=pa_csv.ParseOptions(delimiter=sep),
+            convert_options=pa_csv.ConvertOptions(include_columns=columns, include_missing_columns=True),
+        )
+    if ext == ".parquet":
+        import pyarrow.parquet as pq
+        if columns is not None:
+            present = set(pq.read_schema(path).names)
+            columns = [c for c in columns if c in present]
+        return pq.read_table(path, columns=columns, use_threads=use_threads)
+    df = _read_file(Path(path), ext, "pandas", sep, None, None, False)
+    if columns is not None:
+        df = df[[c for c in columns if c in df.columns]]
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def _concat_arrow(tables: list):
+    """
+    Concatena tablas con esquemas distintos: columnas ausentes como nulos,
+    tipos compatibles promovidos (int64 + double → double) y, si no hay tipo
+    común, la columna pasa a texto en todos los archivos.
+    """
+    import pyarrow as pa
+
+    try:
+        return pa.concat_tables(tables, promote_options="permissive")
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        pass
+
+    types = {}
+    for table in tables:
+        for field in table.schema:
+            if not pa.types.is_null(field.type):
+                types.setdefault(field.name, set()).add(field.type)
+    conflicts = []
+    for column, column_types in types.items():
+        try:
+            pa.unify_schemas([pa.schema([(column, t)]) for t in column_types], promote_options="permissive")
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            conflicts.append(column)
+
+    reconciled = []
+    for table in tables:
+        for column in conflicts:
+            if column in table.column_names:
+                i = table.column_names.index(column)
+                table = table.set_column(i, column, table.column(i).cast(pa.string()))
+        reconciled.append(table)
+    return pa.concat_tables(reconciled, promote_options="permissive")
+
+
+def _read_many(sources: List[str], sep: str, columns=None, dtypes=None, provenance: Optional[str] = None,
+               workers: Optional[int] = None) -> pd.DataFrame:
+    import pyarrow as pa
+    from concurrent.futures import ThreadPoolExecutor
+
+    workers = min(workers or os.cpu_count() or 1, len(sources))
+    # con un hilo por archivo, pyarrow no reparte además cada archivo entre núcleos
+    use_threads = workers == 1
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        tables = list(pool.map(lambda path: _read_arrow(path, sep, columns, use_threads), sources))
+
+    table = _concat_arrow(tables)
+    if provenance:
+        # un bloque por archivo, todos con el mismo diccionario de rutas
+        labels = pa.array(sources)
+        table = table.append_column(provenance, pa.chunked_array([
+            pa.DictionaryArray.from_arrays(pa.array(np.full(t.num_rows, i, dtype=np.int32)), labels)
+            for i, t in enumerate(tables)
+        ]))
+    del tables
+    # self_destruct libera cada columna Arrow al convertirla (pico de memoria ~1x)
+    df = table.to_pandas(split_blocks=True, self_destruct=True)
+    if dtypes:
+        df = df.astype({c: t for c, t in dtypes.items() if c in df.columns})
+    return df
+
+
+def _scan_many_polars(sources: List[str], sep: str, dtypes=None, provenance: Optional[str] = None):
+    pl = _polars()
+    scans = []
+    for source in sources:
+        lf = _scan_polars(source, Path(source).suffix.lower(), sep, dtypes)
+        if provenance:
+            lf = lf.with_columns(pl.lit(source).cast(pl.Enum(sources)).alias(provenance))
+        scans.append(lf)
+    # polars lee los archivos en paralelo al ejecutar el plan
+    return pl.concat(scans, how="diagonal_relaxed")
+
+
+# =========================
+# Caché
+# =========================
+# Nivel 1: LRU en memoria acotado por bytes.
+# Nivel 2: Parquet en disco (~/.cache/viewx/datasets o VIEWX_CACHE_DIR),
+#          clave = ruta + mtime + tamaño + opciones de lectura.
+
+_MEMORY_CACHE: "OrderedDict[str, Tuple[pd.DataFrame, int]]" = OrderedDict()
+_MEMORY_CACHE_LIMIT = 256 * 1024 ** 2
+_CACHE_LOCK = threading.Lock()
+_CACHE_STATS = {
+    "memory_hits": 0,
+    "disk_hits": 0,
+    "misses": 0,
+    "load_seconds": {"memory": 0.0, "disk": 0.0, "parse": 0.0},
+    "last": None,
+}
+
+
+def _cache_dir() -> Optional[Path]:
+    """Directorio de la caché en disco, o None si no se puede crear (se lee sin caché)."""
+    base = os.environ.get("VIEWX_CACHE_DIR") or os.path.join(
+        os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "viewx"
+    )
+    path = Path(base) / "datasets"
+    try:
+        path.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return None
+    return path
+
+
+def _disk_base(stat: Tuple[str, int, int], **options) -> Optional[Path]:
+    """
+    Ruta base de una entrada en disco: "<ruta>-<versión>-<opciones>". La
+    versión (mtime/tamaño) permite borrar las entradas viejas del mismo
+    archivo al escribir una nueva.
+    """
+    cache_dir = _cache_dir()
+    if cache_dir is None:
+        return None
+    path_key = hashlib.sha256(stat[0].encode("utf-8")).hexdigest()[:12]
+    version = hashlib.sha256(repr(stat).encode("utf-8")).hexdigest()[:8]
+    return cache_dir / f"{path_key}-{version}-{_cache_key(stat, **options)}"
+
+
+def _prune_stale(base: Path) -> None:
+    """Borra las entradas de otras versiones (mtime/tamaño anteriores) del mismo archivo."""
+    path_key, version = base.name.split("-")[:2]
+    for f in base.parent.glob(f"{path_key}-*"):
+        if not f.name.startswith(f"{path_key}-{version}-"):
+            try:
+                f.unlink()
+            except OSError:
+                pass
+
+
+def _source_stat(name: str) -> Optional[Tuple[str, int, int]]:
+    """(ruta, mtime_ns, tamaño) del archivo que leería `_read_source`."""
+    path = Path(name)
+    bundled = Path(__file__).with_name(path.name)
+    candidate = bundled if bundled.is_file() else path
+    if not candidate.is_file():
+        return None
+    st = candidate.stat()
+    return str(candidate.resolve()), st.st_mtime_ns, st.st_size
+
+
+def _cache_key(stat: Tuple[str, int, int], **options) -> str:
+    raw = json.dumps([list(stat), options], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:24]
+
+
+def _copy_on_write() -> bool:
+    if int(pd.__version__.split(".")[0]) >= 3:
+        return True
+    return pd.get_option("mode.copy_on_write") is True
+
+
+def _view(df: pd.DataFrame) -> pd.DataFrame:
+    # con Copy-on-Write la copia superficial es gratis y modificarla no toca
+    # la caché; sin CoW hace falta una copia real (sigue sin re-parsear)
+    return df.copy(deep=not _copy_on_write())
+
+
+def _memory_get(key: str) -> Optional[pd.DataFrame]:
+    with _CACHE_LOCK:
+        entry = _MEMORY_CACHE.get(key)
+        if entry is None:
+            return None
+        _MEMORY_CACHE.move_to_end(key)
+        return entry[0]
+
+
+def _memory_put(key: str, df: pd.DataFrame) -> None:
+    size = int(df.memory_usage(deep=True).sum())
+    if size > _MEMORY_CACHE_LIMIT:
+        return
+    with _CACHE_LOCK:
+        _MEMORY_CACHE[key] = (df, size)
+        _MEMORY_CACHE.move_to_end(key)
+        total = sum(s for _, s in _MEMORY_CACHE.values())
+        while total > _MEMORY_CACHE_LIMIT:
+            _, (_, evicted) = _MEMORY_CACHE.popitem(last=False)
+            total -= evicted
+
+
+def _disk_get(path: Path) -> Optional[pd.DataFrame]:
+    if not path.exists():
+        return None
+    try:
+        return pd.read_parquet(path)
+    except Exception:
+        # caché corrupta o sin pyarrow/fastparquet: se vuelve a parsear
+        return None
+
+
+def _disk_put(path: Path, df: pd.DataFrame) -> None:
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        df.to_parquet(tmp)
+        os.replace(tmp, path)
+    except Exception:
+        # sin motor parquet o tipos que parquet no admite: sólo caché en memoria
+        if tmp.exists():
+            tmp.unlink()
+        return
+    _prune_stale(path.with_suffix(""))
+
+
+def _record_load(name: str, level: str, seconds: float) -> None:
+    with _CACHE_LOCK:
+        if level == "memory":
+            _CACHE_STATS["memory_hits"] += 1
+        elif level == "disk":
+            _CACHE_STATS["disk_hits"] += 1
+        else:
+            _CACHE_STATS["misses"] += 1
+        _CACHE_STATS["load_seconds"][level] += seconds
+        _CACHE_STATS["last"] = {"name": name, "level": level, "seconds": seconds}
+
+
+def _cached_read(name: str, ext: str, backend: str, sep: str, cache: bool = True,
+                 columns: Optional[List[str]] = None, dtypes: Optional[dict] = None,
+                 optimize_memory: bool = False):
+    t0 = time.perf_counter()
+    stat = _source_stat(name) if cache else None
+    if stat is None:
+        df = _read_source(name, ext, backend, sep, columns, dtypes, optimize_memory)
+        _record_load(name, "parse", time.perf_counter() - t0)
+        return df
+
+    key = _cache_key(stat, ext=ext, backend=backend, sep=sep, columns=columns,
+                     dtypes=dtypes, optimize_memory=optimize_memory)
+    df = _memory_get(key)
+    level = "memory"
+    if df is None:
+        # un .parquet de origen ya es columnar: no se duplica en disco
+        base = _disk_base(stat, ext=ext, backend=backend, sep=sep, columns=columns,
+                          dtypes=dtypes, optimize_memory=optimize_memory) if ext != ".parquet" else None
+        disk = base.with_name(base.name + ".parquet") if base is not None else None
+        df = _disk_get(disk) if disk is not None else None
+        level = "disk"
+        if df is None:
+            df = _read_source(name, ext, backend, sep, columns, dtypes, optimize_memory)
+            level = "parse"
+            if disk is not None:
+                _disk_put(disk, df)
+        _memory_put(key, df)
+    _record_load(name, level, time.perf_counter() - t0)
+    return _view(df)
+
+
+def _cached_X_y(stat, name: str, read, **options) -> Tuple[NDArray, NDArray]:
+    """
+    (X, y) guardados como .npy y devueltos con memory-map copy-on-write: las
+    cargas siguientes no parsean ni copian, y los arrays se pueden modificar
+    (los cambios no llegan al archivo).
+    """
+    t0 = time.perf_counter()
+    base = _disk_base(stat, kind="X_y", **options)
+    if base is None:
+        return read()
+    X_path, y_path = Path(f"{base}.X.npy"), Path(f"{base}.y.npy")
+    if X_path.exists() and y_path.exists():
+        try:
+            X, y = np.load(X_path, mmap_mode="c"), np.load(y_path, mmap_mode="c")
+            _record_load(name, "disk", time.perf_counter() - t0)
+            return X, y
+        except (OSError, ValueError):
+            pass
+
+    X, y = read()
+    if y.dtype == object and not pd.isna(y).any():
+        # etiquetas de texto: ancho fijo ('<U..') para poder mapearlas
+        y = y.astype(str)
+    if X.dtype == object or y.dtype == object:
+        return X, y  # objetos Python: no se pueden mapear a memoria
+    try:
+        for path, values in ((X_path, X), (y_path, y)):
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp.npy")
+            np.save(tmp, values)
+            os.replace(tmp, path)
+    except OSError:
+        return X, y  # disco lleno o sin permisos: se devuelven sin caché
+    _prune_stale(base)
+    return np.load(X_path, mmap_mode="c"), np.load(y_path, mmap_mode="c")
+
+
+def _disk_files() -> List[Path]:
+    cache_dir = _cache_dir()
+    if cache_dir is None:
+        return []
+    return list(cache_dir.glob("*.parquet")) + list(cache_dir.glob("*.npy"))
+
+
+def cache_info() -> dict:
+    """
+    Estadísticas de la caché de `load_dataset`: aciertos por nivel, tasa de
+    acierto, tiempo total de carga por nivel y ocupación en memoria y disco.
+    """
+    disk_files = _disk_files()
+    with _CACHE_LOCK:
+        loads = _CACHE_STATS["memory_hits"] + _CACHE_STATS["disk_hits"] + _CACHE_STATS["misses"]
+        hits = _CACHE_STATS["memory_hits"] + _CACHE_STATS["disk_hits"]
+        return {
+            "memory_hits": _CACHE_STATS["memory_hits"],
+            "disk_hits": _CACHE_STATS["disk_hits"],
+            "misses": _CACHE_STATS["misses"],
+            "hit_rate": hits / loads if loads else 0.0,
+            "load_seconds": dict(_CACHE_STATS["load_seconds"]),
+            "last": _CACHE_STATS["last"],
+            "memory_entries": len(_MEMORY_CACHE),
+            "memory_bytes": sum(s for _, s in _MEMORY_CACHE.values()),
+            "memory_limit": _MEMORY_CACHE_LIMIT,
+            "disk_entries": len(disk_files),
+            "disk_bytes": sum(f.stat().st_size for f in disk_files),
+        }
+
+
+def set_cache_limit(max_bytes: int) -> None:
+    """Límite en bytes de la caché en memoria (0 la desactiva)."""
+    global _MEMORY_CACHE_LIMIT
+    _MEMORY_CACHE_LIMIT = int(max_bytes)
+    with _CACHE_LOCK:
+        total = sum(s for _, s in _MEMORY_CACHE.values())
+        while _MEMORY_CACHE and total > _MEMORY_CACHE_LIMIT:
+            _, (_, evicted) = _MEMORY_CACHE.popitem(last=False)
+            total -= evicted
+
+
+def clear_cache(disk: bool = False) -> None:
+    """Vacía la caché en memoria (y la de disco si `disk=True`) y reinicia las estadísticas."""
+    with _CACHE_LOCK:
+        _MEMORY_CACHE.clear()
+        _CACHE_STATS.update(memory_hits=0, disk_hits=0, misses=0, last=None)
+        _CACHE_STATS["load_seconds"] = {"memory": 0.0, "disk": 0.0, "parse": 0.0}
+    if disk:
+        for f in _disk_files():
+            f.unlink()
+
+
 def load_dataset(
         name: str,
         backend: str = "pandas",
         return_X_y: Optional[Tuple[List[str], str]] = None,
-        sep: str = ","
+        sep: str = ",",
+        cache: bool = True,
+        columns: Optional[List[str]] = None,
+        filters=None,
+        lazy: bool = False,
+        dtypes: Optional[dict] = None,
+        optimize_memory: bool = False,
+        X_dtype=None,
+        sample=None,
+        provenance: Union[bool, str] = False,
+        workers: Optional[int] = None
     ) -> Union[pd.DataFrame, Tuple[NDArray, NDArray]]:
     """
-    Carga un dataset interno del paquete.
+    Carga un dataset interno del paquete o un archivo local.
 
-    Datasets disponibles:
-    - iris.csv
-    - penguins.csv
-    - sp500_companies.csv
-    - titanic.csv
-    - course_completion.csv
-    - Cocoa_Bubbles_Investment_Nigeria_Ghana_1980_2023.xlsx
+    Datasets del paquete: iris.csv, penguins.csv, sp500_companies.csv y
+    titanic.csv. `list_datasets()` y `dataset_info(name)` devuelven la lista
+    y su esquema sin leer los archivos.
 
     Parámetros
     ----------
     name : str
-        Nombre del archivo CSV.
+        Nombre del dataset o ruta local (.csv, .parquet, .xlsx, .xls,
+        .json, .jsonl). Un glob ("datos/2024-*.csv") o un directorio carga
+        todos sus archivos como un único DataFrame, en paralelo y con los
+        esquemas unificados (columnas ausentes como nulos, tipos promovidos).
     backend : {'pandas', 'polars'}, default='pandas'
         Backend de DataFrame a utilizar.
     return_X_y : tuple[list[str], str], optional
-        Si se especifica, devuelve (X, y) como arrays numpy,
+        Si se especifica, devuelve (X, y) como arrays numpy, con X
+        C-contiguo. Con `cache=True` se guardan como .npy y se devuelven
+        memory-mapped (copy-on-write: modificables sin tocar la caché); las
+        cargas siguientes no vuelven a parsear.
+    X_dtype : dtype, optional
+        Tipo de X con `return_X_y` (por ejemplo 'float32').
+    sample : int, float o dict, optional
+        Muestra tomada durante una lectura por bloques (una pasada, memoria
+        acotada): un entero es el número de filas (muestreo reservoir), un
+        float la fracción. Con dict: {"n" | "frac", "method": "random" |
+        "head" | "tail" | "stratified", "by": columna, "seed": 42}. El
+        estratificado mantiene las proporciones de cada grupo (con "frac"
+        hace antes una pasada que lee sólo la columna "by"). Las filas
+        conservan su número de fila original como índice.
+    cache : bool, default=True
+        Reutiliza lecturas anteriores: LRU en memoria y copia Parquet en
+        disco (válida mientras no cambien mtime/tamaño del archivo ni `sep`).
+        Ver `cache_info()` y `clear_cache()`. Sólo aplica al backend pandas.
+    columns : list[str], optional
+        Columnas a leer (el resto no se parsea).
+    filters : polars.Expr o lista de polars.Expr, optional
+        Sólo con backend='polars': filas a conservar, evaluadas durante el
+        escaneo (junto con `columns`) sin materializar el archivo completo.
+    lazy : bool, default=False
+        Sólo con backend='polars': devuelve el `LazyFrame` sin ejecutar.
+    dtypes : dict, optional
+        Tipos por columna aplicados al parsear (`{"Pclass": "int8"}`). Con
+        backend='polars' los nombres de pandas/numpy se traducen (`"int8"` →
+        `pl.Int8`, `"category"` → `pl.Categorical`); también se aceptan tipos
+        de polars.
+    optimize_memory : bool, default=False
+        Reduce numéricos al tipo más pequeño sin pérdida (enteros y float32
+        cuando es exacto) y convierte textos con pocos valores únicos a
+        'category', bloque a bloque durante la lectura (con polars, como casts
+        dentro del plan de escaneo). El informe de
+        memoria queda en `df.attrs["memory_report"]` (bytes antes/después y
+        tipos elegidos).
+    provenance : bool o str, default=False
+        Con varios archivos, añade una columna categórica con la ruta de
+        origen de cada fila ("source" si es True, o el nombre indicado).
+    workers : int, optional
+        Hilos para leer varios archivos (por defecto, uno por núcleo).
 
     Retorna
     -------
@@ -106,8 +1106,12 @@ def load_dataset(
             f"Use uno de {_SUPPORTED_BACKENDS}."
         )
 
-    path = Path(name)
-    resource_name = path.name
+    sources = _expand_sources(name)
+    if provenance is True:
+        provenance = "source"
+    provenance = (provenance or None) if sources is not None else None
+
+    path = Path(sources[0] if sources else name)
     ext = path.suffix.lower()
 
 
@@ -117,35 +1121,374 @@ def load_dataset(
             f"Soportadas: {_SUPPORTED_EXTENSIONS}"
         )
 
-    df = None
+    if backend == "pandas" and (filters is not None or lazy):
+        raise ValueError("`filters` y `lazy` requieren backend='polars'.")
 
-    # 1️⃣ Intentar cargar desde el paquete
-    try:
-        data_bytes = pkgutil.get_data("viewx.datasets", resource_name)
+    spec = _sample_spec(sample) if sample is not None else None
 
-        if data_bytes is not None:
-            buffer = io.BytesIO(data_bytes)
-            df = _read_file(buffer, ext, backend, sep)
-    except FileNotFoundError:
-        pass
+    def read():
+        if backend == "polars":
+            return _load_polars(name, ext, sep, return_X_y, columns, filters, lazy, dtypes,
+                                optimize_memory, X_dtype, spec, sources, provenance)
 
-    # 2️⃣ Intentar cargar desde ruta local
-    if df is None:
-        if not path.exists():
-            raise FileNotFoundError(
-                f"Dataset '{name}' no encontrado "
-                f"ni en viewx.datasets ni en la ruta local."
-            )
-        df = _read_file(path, ext, backend, sep)
-
-    # 3️⃣ Devolver X, y si se solicita
+        if spec is not None:
+            df = _sampled_read(name, ext, sep, columns, dtypes, spec, sources, provenance)
+            if optimize_memory:
+                df = _compact_frame(df, dtypes)
+        elif sources is not None:
+            needed = columns
+            if return_X_y is not None and columns is None:
+                needed = list(dict.fromkeys(list(return_X_y[0]) + [return_X_y[1]]))
+            df = _read_many(sources, sep, needed, dtypes, provenance, workers)
+            if optimize_memory:
+                df = _compact_frame(df, dtypes)
+        else:
+            df = _cached_read(name, ext, backend, sep, cache, columns, dtypes, optimize_memory)
+
+        # 3️⃣ Devolver X, y si se solicita
+        if return_X_y is not None:
+            X_columns, y_column = return_X_y
+            return _X_y(df, list(X_columns), y_column, X_dtype)
+
+        return df
+
+    cacheable = cache and return_X_y is not None and spec is None and sources is None
+    stat = _source_stat(name) if cacheable else None
+    if stat is not None:
+        X_columns, y_column = return_X_y
+        return _cached_X_y(
+            stat, name, read,
+            X_columns=list(X_columns), y_column=y_column, X_dtype=str(np.dtype(X_dtype)) if X_dtype else None,
+            sep=sep, dtypes=dtypes, filters=str(filters) if filters is not None else None,
+            backend=backend, columns=columns, optimize_memory=optimize_memory,
+        )
+    return read()
+
+
+def _load_polars(name, ext, sep, return_X_y, columns, filters, lazy, dtypes=None, optimize_memory=False,
+                 X_dtype=None, spec=None, sources=None, provenance=None):
+    if spec is not None and spec["method"] not in ("head", "tail"):
+        if filters is not None:
+            raise ValueError("Con backend='polars', `filters` sólo se combina con sample head/tail.")
+        # mismo muestreo por bloques que pandas; sólo el resultado pasa a polars
+        df = _polars().from_pandas(_sampled_read(name, ext, sep, columns, dtypes, spec, sources, provenance),
+                                   include_index=False)
+        if return_X_y is not None:
+            X_columns, y_column = return_X_y
+            return _X_y(df, list(X_columns), y_column, X_dtype)
+        return _compact_polars(df, dtypes) if optimize_memory else df
+
+    if sources is None:
+        lf = _scan_polars(name, ext, sep, dtypes)
+    else:
+        lf = _scan_many_polars(sources, sep, dtypes, provenance)
+    if filters is not None:
+        lf = lf.filter(*filters) if isinstance(filters, (list, tuple)) else lf.filter(filters)
+
+    needed = columns
     if return_X_y is not None:
         X_columns, y_column = return_X_y
-        return _X_y(df, X_columns, y_column)
+        _validate_columns(lf, list(X_columns), y_column)
+        # sólo se escanean las columnas de X e y (sin repetir: y puede estar en X)
+        needed = list(dict.fromkeys(list(X_columns) + [y_column]))
+        if columns is not None:
+            outside = [c for c in needed if c not in columns]
+            if outside:
+                raise ValueError(f"Columnas de return_X_y fuera de `columns`: {outside}")
+    if needed is not None:
+        lf = lf.select(needed)
+    if spec is not None:
+        lf = lf.head(spec["n"]) if spec["method"] == "head" else lf.tail(spec["n"])
+    if optimize_memory and return_X_y is None:
+        # los casts entran en el plan: cada bloque se reduce al leerlo
+        lf = lf.with_columns(_compaction_casts(lf, dtypes))
+    if lazy and return_X_y is None:
+        return lf
 
+    df = lf.collect(engine="streaming") if optimize_memory else lf.collect()
+    if return_X_y is not None:
+        return _X_y(df, list(X_columns), y_column, X_dtype)
     return df
 
 
+def _smallest_int(pl, lo, hi):
+    candidates = ("UInt8", "UInt16", "UInt32", "UInt64") if lo >= 0 else ("Int8", "Int16", "Int32", "Int64")
+    for name in candidates:
+        dtype = getattr(pl, name)
+        info = np.iinfo(name.lower())
+        if info.min <= lo and hi <= info.max:
+            return dtype
+    return None
+
+
+def _compaction_casts(lf, dtypes=None) -> list:
+    """
+    Mismo plan que `_column_plan` para polars, como expresiones de cast. Los
+    rangos, la exactitud en float32 y los valores únicos salen de una sola
+    agregación en streaming: la tabla nunca se materializa con 64 bits.
+    """
+    pl = _polars()
+    schema = lf.collect_schema()
+    stats = []
+    for name, dtype in schema.items():
+        if dtypes and name in dtypes:
+            continue
+        col = pl.col(name)
+        if dtype.is_integer():
+            stats += [col.min().alias(f"{name}\0min"), col.max().alias(f"{name}\0max")]
+        elif dtype == pl.Float64:
+            exact = (col.cast(pl.Float32).cast(pl.Float64) == col) | col.is_null() | col.is_nan()
+            stats.append(exact.all().alias(f"{name}\0exact"))
+        elif dtype == pl.String:
+            stats.append(col.n_unique().alias(f"{name}\0unique"))
+    if not stats:
+        return []
+    stats = lf.select(stats + [pl.len().alias("\0rows")]).collect(engine="streaming").row(0, named=True)
+
+    casts = []
+    for name, dtype in schema.items():
+        target = None
+        if f"{name}\0min" in stats and stats[f"{name}\0min"] is not None:
+            target = _smallest_int(pl, stats[f"{name}\0min"], stats[f"{name}\0max"])
+        elif stats.get(f"{name}\0exact"):
+            target = pl.Float32
+        elif f"{name}\0unique" in stats and stats[f"{name}\0unique"] <= _CATEGORY_RATIO * max(stats["\0rows"], 1):
+            target = pl.Categorical
+        if target is not None and target != dtype:
+            casts.append(pl.col(name).cast(target))
+    return casts
+
+
+def _compact_polars(df, dtypes=None):
+    """Compacta un DataFrame de polars ya leído (muestras)."""
+    return df.lazy().with_columns(_compaction_casts(df.lazy(), dtypes)).collect()
+
+
+# =========================
+# Registro de datasets
+# =========================
+# index.json (junto a este archivo) trae los metadatos de los datasets del
+# paquete ya calculados. Los directorios locales se indexan en la caché y
+# sólo se vuelven a perfilar los archivos cuyo mtime/tamaño cambió.
+
+_INDEX_VERSION = 1
+_UNIQUE_CAP = 10_000
+_INDEXABLE = {".csv", ".parquet", ".jsonl", ".json", ".xlsx", ".xls"}
+
+
+def _file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _json_value(value):
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if isinstance(value, (np.integer, np.bool_)):
+        return value.item()
+    if isinstance(value, np.floating):
+        return float(value)
+    if isinstance(value, (int, float, str, bool)):
+        return value
+    return str(value)
+
+
+class _ColumnProfile:
+    """Estadísticas de una columna acumuladas bloque a bloque."""
+
+    def __init__(self, name: str, dtype: str):
+        self.name, self.dtype = name, dtype
+        self.nulls = 0
+        self.min = self.max = None
+        self.sum, self.count = 0.0, 0
+        self.values = set()
+
+    def update(self, values: pd.Series) -> None:
+        self.nulls += int(values.isna().sum())
+        values = values.dropna()
+        if values.empty:
+            return
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            lo, hi = values.min(), values.max()
+            self.min = lo if self.min is None else min(self.min, lo)
+            self.max = hi if self.max is None else max(self.max, hi)
+            self.sum += float(values.sum())
+            self.count += len(values)
+        elif pd.api.types.is_datetime64_any_dtype(values):
+            lo, hi = values.min(), values.max()
+            self.min = lo if self.min is None else min(self.min, lo)
+            self.max = hi if self.max is None else max(self.max, hi)
+        elif self.values is not None:
+            self.values.update(values.astype(str).unique())
+            if len(self.values) > _UNIQUE_CAP:
+                self.values = None  # demasiados valores distintos para contarlos
+
+    def to_dict(self) -> dict:
+        info = {"name": self.name, "dtype": self.dtype, "nulls": self.nulls}
+        if self.min is not None:
+            info.update(min=_json_value(self.min), max=_json_value(self.max))
+        if self.count:
+            info["mean"] = self.sum / self.count
+        if self.min is None:
+            info["unique"] = len(self.values) if self.values is not None else None
+        return info
+
+
+def _profile_file(path: Path) -> dict:
+    """Metadatos de un archivo: esquema, filas, tamaño, estadísticas y hash."""
+    ext = path.suffix.lower()
+    if ext in {".csv", ".parquet", ".jsonl"}:
+        chunks = iter_dataset(str(path))
+    else:
+        chunks = iter([_read_file(path, ext, "pandas", ",")])
+
+    rows, profiles = 0, None
+    for chunk in chunks:
+        if profiles is None:
+            profiles = [_ColumnProfile(str(c), str(chunk[c].dtype)) for c in chunk.columns]
+        rows += len(chunk)
+        for profile, col in zip(profiles, chunk.columns):
+            profile.update(chunk[col])
+
+    st = path.stat()
+    return {
+        "name": path.name,
+        "format": ext.lstrip("."),
+        "bytes": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "rows": rows,
+        "columns": [p.to_dict() for p in profiles or []],
+        "sha256": _file_sha256(path),
+    }
+
+
+def _read_index(path: Optional[Path]) -> dict:
+    if path is None:
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if index.get("version") != _INDEX_VERSION:
+        return {}
+    return index.get("datasets", {})
+
+
+def _write_index(path: Path, datasets: dict) -> None:
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": _INDEX_VERSION, "datasets": datasets}, f, indent=1, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _is_stale(entry: Optional[dict], path: Path, check_mtime: bool = True) -> bool:
+    st = path.stat()
+    return entry is None or entry["bytes"] != st.st_size or (
+        check_mtime and entry.get("mtime_ns") != st.st_mtime_ns
+    )
+
+
+def _save_index(index_path: Optional[Path], datasets: dict) -> None:
+    if index_path is None:
+        return  # sin directorio de caché: el índice queda sólo en memoria
+    try:
+        _write_index(index_path, datasets)
+    except OSError:
+        pass  # directorio de sólo lectura: el índice queda sólo en memoria
+
+
+def _refresh_index(directory: Path, index_path: Path, check_mtime: bool = True) -> dict:
+    """Actualiza el índice de `directory` perfilando sólo archivos nuevos o modificados."""
+    datasets = _read_index(index_path)
+    current, changed = {}, False
+    for path in sorted(directory.iterdir()):
+        if not path.is_file() or path.suffix.lower() not in _INDEXABLE or path == index_path:
+            continue
+        entry = datasets.get(path.name)
+        if _is_stale(entry, path, check_mtime):
+            entry = _profile_file(path)
+            changed = True
+        current[path.name] = entry
+    if changed or current.keys() != datasets.keys():
+        _save_index(index_path, current)
+    return current
+
+
+_BUNDLED_INDEX = None
+
+
+def _bundled_index() -> dict:
+    global _BUNDLED_INDEX
+    if _BUNDLED_INDEX is None:
+        # al instalar el paquete cambia el mtime pero no el tamaño: sólo se compara el tamaño
+        here = Path(__file__).parent
+        _BUNDLED_INDEX = _refresh_index(here, here / "index.json", check_mtime=False)
+    return _BUNDLED_INDEX
+
+
+def _local_index_path(directory: Path) -> Optional[Path]:
+    cache_dir = _cache_dir()
+    if cache_dir is None:
+        return None
+    key = hashlib.sha256(str(directory).encode("utf-8")).hexdigest()[:16]
+    return cache_dir / f"index-{key}.json"
+
+
+def _local_index(directory: Union[str, Path]) -> dict:
+    directory = Path(directory).resolve()
+    if not directory.is_dir():
+        raise FileNotFoundError(f"Directorio '{directory}' no encontrado.")
+    return _refresh_index(directory, _local_index_path(directory))
+
+
+def _local_entry(path: Path) -> dict:
+    """Entrada del índice de un solo archivo: se perfila (y se guarda) sólo ese archivo."""
+    path = path.resolve()
+    index_path = _local_index_path(path.parent)
+    datasets = _read_index(index_path)
+    entry = datasets.get(path.name)
+    if _is_stale(entry, path):
+        entry = datasets[path.name] = _profile_file(path)
+        _save_index(index_path, datasets)
+    return entry
+
+
+def list_datasets(directory: Optional[str] = None) -> List[str]:
+    """
+    Nombres de los datasets disponibles: los del paquete o, con `directory`,
+    los archivos soportados de ese directorio (indexados en la caché).
+    """
+    index = _bundled_index() if directory is None else _local_index(directory)
+    return sorted(index)
+
+
+def dataset_info(name: str) -> dict:
+    """
+    Metadatos de un dataset sin leerlo: formato, bytes, filas, columnas
+    (dtype, nulos, min/max/media o número de valores distintos) y sha256.
+    Los datasets del paquete vienen precalculados; los locales se perfilan
+    una vez y se reutilizan mientras no cambien.
+    """
+    path = Path(name)
+    bundled = _bundled_index()
+    if path.name in bundled and Path(__file__).with_name(path.name).is_file():
+        return dict(bundled[path.name], bundled=True)
+    if not path.is_file():
+        raise FileNotFoundError(
+            f"Dataset '{name}' no encontrado "
+            f"ni en viewx.datasets ni en la ruta local."
+        )
+    if path.suffix.lower() not in _INDEXABLE:
+        raise ValueError(
+            f"Extensión '{path.suffix.lower()}' no soportada. "
+            f"Soportadas: {_INDEXABLE}"
+        )
+    return dict(_local_entry(path), bundled=False, path=str(path.resolve()))
+
 
 # =========================
 # Datasets específicos
@@ -173,106 +1516,337 @@ def load_penguins(
     )
 
 
-from typing import Optional
+# =========================
+# Datos sintéticos
+# =========================
+# Cada bloque de `chunk_size` filas usa su propio generador, derivado con
+# SeedSequence.spawn de la semilla: el resultado es el mismo con cualquier
+# número de procesos.
 
-def generate_dataset(n_rows, schema, seed=None, save: Optional[bool] = False, filename: Optional[str] = None):
-    if seed is not None:
-        if not isinstance(seed, int):
-            raise TypeError("seed debe ser un entero o None")
-        np.random.seed(seed)
-    else:
-        np.random.seed(42)
+_DISTRIBUTIONS = {"normal", "uniform", "exponential", "lognormal", "poisson", "binomial", "categorical",
+                  "correlated", "datetime", "random_walk", "ar"}
+# series cuyo valor depende del bloque anterior: se encadenan al consumir los bloques en orden
+_SERIES = {"random_walk", "ar"}
+_GENERATE_CHUNK_ROWS = 1_000_000
+_AR_BLOCK = 128
 
+
+def _validate_schema(schema) -> None:
     if not isinstance(schema, dict):
         raise TypeError("schema debe ser un diccionario")
-    
-
-
-    data = {}
-
     for col, config in schema.items():
         if "dist" not in config:
             raise ValueError(f"La columna '{col}' no tiene 'dist' definido")
-
         dist = config["dist"]
+        if dist not in _DISTRIBUTIONS:
+            raise ValueError(f"Distribución no soportada: {dist}")
+        if dist == "categorical":
+            if "choices" not in config:
+                raise ValueError(f"'choices' es requerido para categorical ({col})")
+            weights = config.get("weights")
+            if weights is not None and len(weights) != len(config["choices"]):
+                raise ValueError(f"'weights' debe tener un peso por opción ({col})")
+        elif dist == "datetime":
+            if "start" not in config:
+                raise ValueError(f"'start' es requerido para datetime ({col})")
+        elif dist == "correlated":
+            if "columns" not in config or ("cov" not in config and "corr" not in config):
+                raise ValueError(f"'columns' y 'cov' (o 'corr') son requeridos para correlated ({col})")
+            try:
+                np.linalg.cholesky(_covariance(config))
+            except np.linalg.LinAlgError as e:
+                raise ValueError(f"La matriz de covarianza de '{col}' no es definida positiva") from e
+        elif dist == "ar" and abs(config.get("phi", 0.9)) >= 1:
+            raise ValueError(f"'phi' debe cumplir |phi| < 1 en ar ({col}); use random_walk")
         dtype = config.get("type", "float")
+        if dist not in ("categorical", "datetime") and dtype not in ("int", "float"):
+            try:
+                np.dtype(dtype)
+            except TypeError:
+                raise ValueError(f"Tipo no soportado: {dtype}") from None
+
+
+def _covariance(config: dict) -> NDArray:
+    if "cov" in config:
+        return np.asarray(config["cov"], dtype=float)
+    corr = np.asarray(config["corr"], dtype=float)
+    std = np.broadcast_to(np.asarray(config.get("std", 1.0), dtype=float), corr.shape[:1])
+    return corr * np.outer(std, std)
+
+
+def _cast_round(values: NDArray, config: dict, compact: bool = False) -> NDArray:
+    dtype = config.get("type", "float")
+
+    # ---------- CASTEO DE TIPO ----------
+    if dtype == "int":
+        values = np.round(values).astype(np.int32 if compact else int)
+    elif dtype == "float":
+        values = values.astype(float)
+    else:
+        values = values.astype(dtype)
+
+    # ---------- REDONDEO ----------
+    if values.dtype.kind == "f":
         nround = config.get("round", 0)
+        values = np.round(values, nround if nround > 0 else 2)
+        if compact and dtype == "float":
+            values = values.astype(np.float32)
+    return values
 
-        # ---------- DISTRIBUCIONES ----------
-        if dist == "normal":
-            values = np.random.normal(
-                loc=config.get("mean", 0),
-                scale=config.get("std", 1),
-                size=n_rows
-            )
-
-        elif dist == "uniform":
-            values = np.random.uniform(
-                low=config.get("low", 0),
-                high=config.get("high", 1),
-                size=n_rows
-            )
-
-        elif dist == "exponential":
-            values = np.random.exponential(
-                scale=config.get("scale", 1),
-                size=n_rows
-            )
-
-        elif dist == "lognormal":
-            values = np.random.lognormal(
-                mean=config.get("mean", 0),
-                sigma=config.get("std", 1),
-                size=n_rows
-            )
-
-        elif dist == "poisson":
-            values = np.random.poisson(
-                lam=config.get("lam", 1),
-                size=n_rows
-            )
-
-        elif dist == "binomial":
-            values = np.random.binomial(
-                n=config.get("n", 1),
-                p=config.get("p", 0.5),
-                size=n_rows
-            )
-
-        elif dist == "categorical":
-            if "choices" not in config:
-                raise ValueError(f"'choices' es requerido para categorical ({col})")
-            values = np.random.choice(
-                config["choices"],
-                size=n_rows
-            )
-            data[col] = values
-            continue
 
+def _ar_filter(noise: NDArray, phi: float, y0: float = 0.0) -> NDArray:
+    """
+    y[t] = phi * y[t-1] + noise[t] vectorizado: dentro de bloques de
+    `_AR_BLOCK` con una matriz de potencias de phi, y sólo el arrastre entre
+    bloques en un bucle corto.
+    """
+    n = len(noise)
+    B = _AR_BLOCK
+    padded = np.zeros(-(-n // B) * B)
+    padded[:n] = noise
+    blocks = padded.reshape(-1, B)
+    k = np.arange(B)
+    powers = np.tril(phi ** np.maximum(k[:, None] - k[None, :], 0))
+    local = blocks @ powers.T
+    decay = phi ** (k + 1)
+    carry = np.empty(len(blocks))
+    prev = y0
+    for b in range(len(blocks)):
+        carry[b] = prev
+        prev = local[b, -1] + decay[-1] * prev
+    return (local + carry[:, None] * decay[None, :]).ravel()[:n]
+
+
+def _generate_column(rng: np.random.Generator, config: dict, n_rows: int, offset: int = 0,
+                     compact: bool = False):
+    dist = config["dist"]
+
+    # ---------- DISTRIBUCIONES ----------
+    if dist == "normal":
+        values = rng.normal(loc=config.get("mean", 0), scale=config.get("std", 1), size=n_rows)
+    elif dist == "uniform":
+        values = rng.uniform(low=config.get("low", 0), high=config.get("high", 1), size=n_rows)
+    elif dist == "exponential":
+        values = rng.exponential(scale=config.get("scale", 1), size=n_rows)
+    elif dist == "lognormal":
+        values = rng.lognormal(mean=config.get("mean", 0), sigma=config.get("std", 1), size=n_rows)
+    elif dist == "poisson":
+        values = rng.poisson(lam=config.get("lam", 1), size=n_rows)
+    elif dist == "binomial":
+        values = rng.binomial(n=config.get("n", 1), p=config.get("p", 0.5), size=n_rows)
+    elif dist == "categorical":
+        # se sortean códigos y se construye un Categorical (sin arrays de texto)
+        choices = list(config["choices"])
+        weights = config.get("weights")
+        p = np.asarray(weights, dtype=float) / np.sum(weights) if weights is not None else None
+        codes = rng.choice(len(choices), size=n_rows, p=p)
+        return pd.Categorical.from_codes(codes.astype(np.min_scalar_type(max(len(choices) - 1, 0))), choices)
+    elif dist == "datetime":
+        start = pd.Timestamp(config["start"])
+        freq = pd.tseries.frequencies.to_offset(config.get("freq", "D"))
+        try:
+            step = pd.Timedelta(freq)
+        except ValueError:
+            # frecuencias de calendario (meses, días hábiles...): no son un paso fijo
+            return pd.date_range(start, periods=offset + n_rows, freq=freq)[offset:]
+        return start + step * (offset + np.arange(n_rows))
+    elif dist == "random_walk":
+        steps = rng.normal(loc=config.get("drift", 0), scale=config.get("std", 1), size=n_rows)
+        return np.cumsum(steps)  # el arrastre desde el bloque anterior se suma al consumir
+    else:  # ar
+        noise = rng.normal(scale=config.get("std", 1), size=n_rows)
+        return _ar_filter(noise, config.get("phi", 0.9))  # desviación respecto a 'mean'
+
+    return _cast_round(values, config, compact)
+
+
+def _generate_chunk(schema: dict, n_rows: int, seed: np.random.SeedSequence, offset: int = 0,
+                    compact: bool = False) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    data = {}
+    for col, config in schema.items():
+        if config["dist"] == "correlated":
+            # Cholesky: z ~ N(0, I)  ->  z @ L.T ~ N(0, cov)
+            cov = _covariance(config)
+            L = np.linalg.cholesky(cov)
+            mean = np.broadcast_to(np.asarray(config.get("mean", 0.0), dtype=float), cov.shape[:1])
+            values = rng.standard_normal((n_rows, len(mean))) @ L.T + mean
+            for i, name in enumerate(config["columns"]):
+                data[name] = _cast_round(values[:, i], config, compact)
         else:
-            raise ValueError(f"Distribución no soportada: {dist}")
+            data[col] = _generate_column(rng, config, n_rows, offset, compact)
+    return pd.DataFrame(data)
 
-        # ---------- CASTEO DE TIPO ----------
-        if dtype == "int":
-            values = np.round(values).astype(int)
-        elif dtype == "float":
-            values = values.astype(float)
+
+def _chain_series(chunk: pd.DataFrame, schema: dict, state: dict, compact: bool) -> pd.DataFrame:
+    """Continúa random_walk/ar desde el último valor del bloque anterior y aplica tipos."""
+    for col, config in schema.items():
+        dist = config["dist"]
+        if dist not in _SERIES:
+            continue
+        local = chunk[col].to_numpy(dtype=float)
+        if dist == "random_walk":
+            values = local + state.get(col, config.get("start", 0.0))
+            state[col] = values[-1] if len(values) else state.get(col, config.get("start", 0.0))
         else:
-            raise ValueError(f"Tipo no soportado: {dtype}")
-        
-        # ---------- REDONDEO ----------
-        if nround > 0:
-            values = np.round(values, nround)
+            phi = config.get("phi", 0.9)
+            prev = state.get(col, 0.0)
+            deviation = local + prev * phi ** np.arange(1, len(local) + 1)
+            state[col] = deviation[-1] if len(deviation) else prev
+            values = deviation + config.get("mean", 0.0)
+        chunk[col] = _cast_round(values, config, compact)
+    return chunk
+
+
+def _generated_chunks(n_rows: int, schema: dict, seed: int, chunk_size: int, workers: int,
+                      compact: bool = False):
+    """Bloques en orden; en paralelo con a lo sumo 2 bloques por proceso en vuelo."""
+    offsets = list(range(0, n_rows, chunk_size))
+    sizes = [min(chunk_size, n_rows - start) for start in offsets]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if workers == 1 or len(sizes) == 1:
+        for size, child, offset in zip(sizes, seeds, offsets):
+            yield _generate_chunk(schema, size, child, offset, compact)
+        return
+
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        jobs = iter(zip(sizes, seeds, offsets))
+        for size, child, offset in jobs:
+            pending.append(pool.submit(_generate_chunk, schema, size, child, offset, compact))
+            if len(pending) >= 2 * workers:
+                break
+        while pending:
+            chunk = pending.popleft().result()
+            for size, child, offset in jobs:
+                pending.append(pool.submit(_generate_chunk, schema, size, child, offset, compact))
+                break
+            yield chunk
+
+
+class _ChunkWriter:
+    """Escribe bloques consecutivos en un único CSV o Parquet."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.parquet = path.suffix.lower() == ".parquet"
+        self.writer = None
+        self.first = True
+
+    def write(self, df: pd.DataFrame) -> None:
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            if self.writer is None:
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                self.writer = pq.ParquetWriter(self.path, table.schema)
+            else:
+                table = pa.Table.from_pandas(df, preserve_index=False, schema=self.writer.schema)
+            self.writer.write_table(table)
         else:
-            values = np.round(values, 2)
+            df.to_csv(self.path, mode="w" if self.first else "a", header=self.first, index=False)
+        self.first = False
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+
 
-        data[col] = values
+def generate_dataset(
+        n_rows: int,
+        schema: dict,
+        seed: Optional[int] = None,
+        save: Optional[bool] = False,
+        filename: Optional[str] = None,
+        chunk_size: int = _GENERATE_CHUNK_ROWS,
+        workers: Optional[int] = 1,
+        return_frame: bool = True,
+        compact: bool = False
+    ):
+    """
+    Genera un dataset sintético a partir de un esquema por columna.
 
-    if save and filename:
-        df = pd.DataFrame(data)
-        df.to_csv(f"{filename}.csv", index=False)
+    Parámetros
+    ----------
+    n_rows : int
+        Número de filas.
+    schema : dict
+        {columna: {"dist": ..., parámetros}}. Distribuciones:
+
+        - normal, uniform, exponential, lognormal, poisson, binomial
+          ("type": "int", "float" o un dtype de numpy; "round").
+        - categorical: "choices" y opcionalmente "weights". Sale como
+          'category'.
+        - datetime: "start" y "freq" (por defecto "D").
+        - random_walk: "start", "drift", "std".
+        - ar: AR(1) con "phi" (|phi| < 1), "mean", "std".
+        - correlated: grupo de columnas normales correlacionadas
+          ("columns", "mean", y "cov" o "corr" + "std"), vía Cholesky. La
+          clave del grupo no se usa como columna.
+
+        Las series (random_walk, ar) continúan entre bloques, así que el
+        resultado es el mismo que generándolas de una vez.
+    seed : int, optional
+        Semilla (42 por defecto). El resultado no depende de `workers`.
+    save : bool, default=False
+        Guarda el resultado en `filename` (CSV por defecto, Parquet si el
+        nombre termina en .parquet). Sin `save` no se escribe nada.
+    filename : str, optional
+        Ruta de salida ("dataset" si no se indica; se añade .csv si no
+        tiene extensión).
+    chunk_size : int, default=1_000_000
+        Filas por bloque. Cada bloque tiene su propio generador aleatorio.
+    workers : int, default=1
+        Procesos que generan bloques en paralelo (None = todos los núcleos;
+        con un solo bloque no se crean procesos). Con más de uno, el script
+        que llama necesita `if __name__ == "__main__":` en macOS/Windows.
+    return_frame : bool, default=True
+        Con `save=True` y `return_frame=False` los bloques se escriben al
+        archivo a medida que se generan (sin tener la tabla completa en
+        memoria) y se devuelve la ruta.
+    compact : bool, default=False
+        float32 en lugar de float64 e int32 en lugar de int64 para las
+        columnas con "type" por defecto.
+
+    Retorna
+    -------
+    DataFrame, o la ruta del archivo si `return_frame=False`
+    """
+    if seed is not None:
+        if not isinstance(seed, (int, np.integer)):
+            raise TypeError("seed debe ser un entero o None")
     else:
-        df = pd.DataFrame(data)
-        df.to_csv("dataset.csv", index=False)
+        seed = 42
+    _validate_schema(schema)
+    if not save and not return_frame:
+        raise ValueError("return_frame=False requiere save=True.")
+
+    path = None
+    if save:
+        path = Path(filename or "dataset")
+        if path.suffix.lower() not in (".csv", ".parquet"):
+            path = path.with_name(path.name + ".csv")
+        writer = _ChunkWriter(path)
+
+    frames, state = [], {}
+    try:
+        workers = workers or os.cpu_count() or 1
+        for chunk in _generated_chunks(n_rows, schema, seed, max(int(chunk_size), 1), workers, compact):
+            chunk = _chain_series(chunk, schema, state, compact)
+            if save:
+                writer.write(chunk)
+            if return_frame:
+                frames.append(chunk)
+    finally:
+        if save:
+            writer.close()
 
-    return pd.DataFrame(data)
\ No newline at end of file
+    if not return_frame:
+        return path
+    if not frames:
+        return _generate_chunk(schema, 0, np.random.SeedSequence(seed), 0, compact)
+    return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
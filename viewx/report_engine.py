@@ -1,22 +1,42 @@
 import os
+import io
+import re
+import time
+import hashlib
+import functools
+import subprocess
+import tempfile
+import json
+import heapq
+import pickle
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pylatex import (
     Document, Section, Subsection, Figure, Table, Tabular,
     NoEscape, Command, Itemize, Enumerate
 )
-from pylatex.utils import escape_latex
+from pylatex.base_classes import LatexObject, Container
+from pylatex.utils import escape_latex, dumps_list
 import shutil
-
+import numpy as np
+import pandas as pd
 
 
 class Report:
     def __init__(self, title="Reporte", author="Autor", outdir="output", twoColumn: bool = False, images_dir = "images"):
 
         self.outdir = outdir
+        self.two_column = twoColumn
         os.makedirs(outdir, exist_ok=True)
 
         # 📂 images dentro de output
         self.images_dir = os.path.join(outdir, images_dir)
         os.makedirs(self.images_dir, exist_ok=True)
+        # bytes ahorrados por imagen (ver add_image(optimize=True))
+        self.image_stats = []
+        # figuras de add_figure pendientes de renderizar: {nombre: (figura | (fn, args, kwargs), dpi)}
+        self._pending_figures = {}
+        # modo streaming (ver stream()): ruta del cuerpo del documento en disco
+        self._stream_body = None
 
         if twoColumn:
             self.doc = Document(
@@ -34,7 +54,7 @@ class Report:
         pkgs = [
             "geometry", "float", "caption", "xcolor",
             "graphicx", "multicol", "listings",
-            "tikz", "pgfplots", "tcolorbox"
+            "tikz", "pgfplots", "tcolorbox", "longtable"
         ]
         for p in pkgs:
             self.doc.packages.append(Command("usepackage", p))
@@ -51,6 +71,9 @@ class Report:
             commentstyle=\color{green!50!black},
         }
         """))
+        # Fin del preámbulo fijo: con build(precompile=True) todo lo anterior
+        # se carga desde un formato precompilado (mylatexformat).
+        self.doc.preamble.append(NoEscape(_ENDOFDUMP))
         self.doc.packages.append(Command("usepackage", "graphicx"))
         self.doc.preamble.append(
             NoEscape(rf"\graphicspath{{{{{images_dir}/}}}}")
@@ -85,8 +108,20 @@ class Report:
         filename,
         caption=None,
         width="0.6\\textwidth",
-        placement="H"
+        placement="H",
+        optimize=True,
+        dpi=300,
+        quality=85,
+        jpeg=False
     ):
+        """
+        optimize: reduce la imagen a la resolución necesaria para `width` a
+            `dpi` y recomprime los PNG sin pérdida. Las variantes se nombran
+            por contenido: la misma imagen añadida dos veces se procesa una
+            sola vez y se reutiliza entre builds.
+        jpeg: convierte las fotos (PNG de muchos colores sin transparencia) a
+            JPEG con `quality`, con pérdida. Desactivado por defecto.
+        """
         # 📂 Ruta destino (output/images)
         target_path = os.path.join(self.images_dir, filename)
 
@@ -97,9 +132,13 @@ class Report:
             local_path = os.path.abspath(filename)
 
             if os.path.exists(local_path):
-                # 🚚 Copiar automáticamente
-                shutil.copy(local_path, target_path)
-                print(f"[ViewX] 📸 Imagen copiada a images/: {filename}")
+                variant = self._optimized_image(local_path, width, dpi, quality, jpeg) if optimize else None
+                if variant is not None:
+                    filename = variant
+                else:
+                    # 🚚 Copiar automáticamente
+                    shutil.copy(local_path, target_path)
+                    print(f"[ViewX] 📸 Imagen copiada a images/: {filename}")
 
             else:
                 # ❌ No existe en ningún lado
@@ -108,6 +147,11 @@ class Report:
                     f"ni en output/images ni en el directorio actual."
                 )
 
+        elif optimize:
+            variant = self._optimized_image(target_path, width, dpi, quality, jpeg)
+            if variant is not None:
+                filename = variant
+
         # 3️⃣ Insertar imagen (LaTeX solo ve el nombre)
         with self.doc.create(Figure(position=placement)) as fig:
             fig.add_image(
@@ -117,22 +161,245 @@ class Report:
             if caption:
                 fig.add_caption(escape_latex(caption))
 
+    def _optimized_image(self, source, width, dpi, quality, jpeg=False):
+        """
+        Devuelve el nombre (en images/) de la variante optimizada de `source`,
+        o None si no conviene (vectorial, sin Pillow o no ahorra bytes).
+        """
+        ext = os.path.splitext(source)[1].lower()
+        if ext not in (".png", ".jpg", ".jpeg"):
+            return None
+        try:
+            from PIL import Image
+        except ImportError:
+            return None
+
+        stat = os.stat(source)
+        memo_key = (os.path.abspath(source), stat.st_mtime_ns, stat.st_size)
+        digest = _IMAGE_DIGESTS.get(memo_key)
+        if digest is None:
+            digest = _file_digest(source).hex()[:16]
+            _IMAGE_DIGESTS[memo_key] = digest
+
+        inches = _latex_width_inches(width, self.two_column)
+        max_px = int(inches * dpi) if inches else None
+        # los JPEG de origen sólo se recodifican al reducirlos (con `quality`)
+        lossy = jpeg or ext in (".jpg", ".jpeg")
+        key = f"{digest}-{max_px or 'orig'}-{f'q{quality}' if lossy else 'lossless'}"
+        stats = {"source": source, "original_bytes": stat.st_size}
 
+        # ♻️ variante ya procesada (en este reporte o en un build anterior)
+        for candidate in (f"vx-{key}.jpg", f"vx-{key}.png"):
+            path = os.path.join(self.images_dir, candidate)
+            if os.path.exists(path):
+                self._record_image(stats, candidate, os.path.getsize(path), reused=True)
+                return candidate
+        if os.path.exists(os.path.join(self.images_dir, f"vx-{key}.orig")):
+            return None  # ya se comprobó que no mejora
 
+        with Image.open(source) as img:
+            img.load()
+            resized = max_px is not None and img.width > max_px
+            if resized:
+                height = max(1, round(img.height * max_px / img.width))
+                img = img.resize((max_px, height), Image.LANCZOS)
+            has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+            source_jpeg = ext in (".jpg", ".jpeg")
+            if source_jpeg and not resized and not jpeg:
+                photo = None  # recomprimir un JPEG sólo perdería calidad
+            elif source_jpeg:
+                photo = True  # al reducirlo se vuelve a guardar como JPEG
+            else:
+                photo = jpeg and not has_alpha and img.getcolors(maxcolors=4096) is None
+
+            buffer = io.BytesIO()
+            if photo is None:
+                name = None
+            elif photo:
+                img.convert("RGB").save(buffer, format="JPEG", quality=quality, optimize=True, progressive=True)
+                name = f"vx-{key}.jpg"
+            else:
+                img.save(buffer, format="PNG", optimize=True)
+                name = f"vx-{key}.png"
+
+        data = buffer.getvalue()
+        if name is None or (len(data) >= stat.st_size and not resized):
+            # no mejora: se usa el original y se recuerda la decisión
+            _write_atomic(os.path.join(self.images_dir, f"vx-{key}.orig"), b"")
+            return None
+        # build_reports puede compartir images/: nunca se lee una variante a medias
+        _write_atomic(os.path.join(self.images_dir, name), data)
+        self._record_image(stats, name, len(data), reused=False)
+        return name
+
+    def _record_image(self, stats, name, size, reused):
+        stats.update({"image": name, "bytes": size, "saved_bytes": stats["original_bytes"] - size, "reused": reused})
+        self.image_stats.append(stats)
+        if not reused:
+            print(f"[ViewX] 📸 {os.path.basename(stats['source'])}: "
+                  f"{stats['original_bytes'] / 1024:.0f} KB → {size / 1024:.0f} KB ({name})")
+
+    # ================== FIGURAS MATPLOTLIB ==================
+    def add_figure(
+        self,
+        fig,
+        caption=None,
+        width="0.8\\textwidth",
+        placement="H",
+        fmt="pdf",
+        dpi=200,
+        args=(),
+        kwargs=None
+    ):
+        """
+        Inserta una figura de matplotlib/seaborn.
+
+        fig: `matplotlib.figure.Figure` o una función (importable) que la crea
+            al llamarse con `args`/`kwargs` (puede devolver Figure, Axes, un
+            grid de seaborn o nada, en cuyo caso se usa la figura actual).
+        fmt: 'pdf' (vectorial) o 'png'.
+
+        Con una función el render se difiere: las figuras pendientes se dibujan
+        en `render_figures()`, que `build()` llama automáticamente (en serie;
+        `render_figures(workers=None)` usa un pool de procesos), y se cachean
+        en images/ por la función y sus argumentos. Una Figure ya creada se guarda al momento con el nombre
+        del hash de lo renderizado (la misma figura reutiliza el archivo).
+        """
+        if fmt not in ("pdf", "png"):
+            raise ValueError("fmt debe ser 'pdf' o 'png'.")
+        kwargs = kwargs or {}
+        if callable(fig) and not hasattr(fig, "savefig"):
+            payload = (fig, tuple(args), kwargs)
+            code = getattr(fig, "__code__", None)
+            key_source = pickle.dumps(payload) + (code.co_code + repr(code.co_consts).encode() if code else b"")
+            key = hashlib.sha256(key_source + f"|{fmt}|{dpi}".encode()).hexdigest()[:16]
+            name = f"fig-{key}.{fmt}"
+            if not os.path.exists(os.path.join(self.images_dir, name)) and name not in self._pending_figures:
+                self._pending_figures[name] = (payload, dpi)
+        else:
+            # el pickle de una Figure no es determinista: la clave sale de los bytes renderizados
+            data = _figure_bytes(fig, fmt, dpi)
+            name = f"fig-{hashlib.sha256(data).hexdigest()[:16]}.{fmt}"
+            target = os.path.join(self.images_dir, name)
+            if not os.path.exists(target):
+                _write_atomic(target, data)
+
+        # Mismo flujo que add_image: LaTeX sólo ve el nombre dentro de images/
+        with self.doc.create(Figure(position=placement)) as f:
+            f.add_image(name, width=NoEscape(width))
+            if caption:
+                f.add_caption(escape_latex(caption))
+
+    def render_figures(self, workers=1):
+        """
+        Dibuja las figuras pendientes de `add_figure`.
+
+        workers: procesos en paralelo (None = todos los núcleos). Por defecto
+            en serie: con spawn (macOS/Windows) las funciones definidas en
+            `__main__` o en un notebook no se pueden enviar a otro proceso.
+        """
+        if not self._pending_figures:
+            return 0
+        jobs = [(payload, os.path.join(self.images_dir, name), dpi)
+                for name, (payload, dpi) in self._pending_figures.items()]
+        t0 = time.perf_counter()
+        if len(jobs) == 1 or workers == 1:
+            for job in jobs:
+                _render_figure(*job)
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_figure_worker) as pool:
+                list(pool.map(_render_figure, *zip(*jobs)))
+        self._pending_figures.clear()
+        print(f"[ViewX] 📈 {len(jobs)} figura(s) renderizadas en {time.perf_counter() - t0:.2f} s")
+        return len(jobs)
 
     # ================== TABLAS ==================
     def add_table(self, headers, rows, caption=""):
         cols = " | ".join(["l"] * len(headers))
-        table_tex = r"\begin{table}[H]\centering" + "\n"
-        table_tex += rf"\caption{{{escape_latex(caption)}}}" + "\n"
-        table_tex += rf"\begin{{tabular}}{{{cols}}}\hline" + "\n"
-        table_tex += " & ".join(escape_latex(h) for h in headers) + r"\\ \hline" + "\n"
+        parts = [
+            r"\begin{table}[H]\centering",
+            rf"\caption{{{escape_latex(caption)}}}",
+            rf"\begin{{tabular}}{{{cols}}}\hline",
+            " & ".join(escape_latex(h) for h in headers) + r"\\ \hline",
+        ]
+        parts.extend(" & ".join(escape_latex(str(c)) for c in row) + r"\\ \hline" for row in rows)
+        parts.append(r"\end{tabular}\end{table}")
+        self._append_tex("\n".join(parts))
+
+    def add_dataframe(
+        self,
+        df,
+        caption="",
+        columns=None,
+        formats=None,
+        float_format=None,
+        max_rows=None,
+        max_col_width=None,
+        index=False,
+        col_spec=None
+    ):
+        """
+        Tabla desde un DataFrame con `longtable` (se parte entre páginas).
+
+        columns: columnas a incluir (None => todas).
+        formats: {columna: "%.2f" | callable} para formatear valores.
+        float_format: formato printf para columnas float sin formato propio.
+        max_rows: filas máximas (se indica cuántas se omitieron).
+        max_col_width: trunca textos a ese número de caracteres.
+        col_spec: especificación de columnas de LaTeX (por defecto 'r' numéricas, 'l' resto).
+        """
+        if index:
+            df = df.reset_index()
+        if columns is not None:
+            df = df[list(columns)]
+        formats = formats or {}
+
+        omitted = 0
+        if max_rows is not None and len(df) > max_rows:
+            omitted = len(df) - max_rows
+            df = df.head(max_rows)
+
+        cells = []
+        for name in df.columns:
+            cells.append(_escape_column(_format_column(df[name], formats.get(name), float_format, max_col_width)))
+
+        n_cols = len(df.columns)
+        if col_spec is None:
+            col_spec = " | ".join(
+                "r" if pd.api.types.is_numeric_dtype(df[c]) and not pd.api.types.is_bool_dtype(df[c]) else "l"
+                for c in df.columns
+            )
+        header = " & ".join(escape_latex(str(c)) for c in df.columns) + r"\\ \hline"
+        caption_tex = escape_latex(caption)
 
-        for row in rows:
-            table_tex += " & ".join(escape_latex(str(c)) for c in row) + r"\\ \hline" + "\n"
+        # cuerpo: una sola concatenación vectorizada por columna + un join final
+        if n_cols and len(df):
+            body = cells[0].str.cat(cells[1:], sep=" & ") if n_cols > 1 else cells[0]
+            body = (body + r"\\ \hline").str.cat(sep="\n")
+        else:
+            body = ""
+        if omitted:
+            body += "\n" + rf"\multicolumn{{{n_cols}}}{{c}}{{\textit{{... {omitted} filas omitidas}}}}\\ \hline"
 
-        table_tex += r"\end{tabular}\end{table}"
-        self.doc.append(NoEscape(table_tex))
+        parts = [
+            rf"\begin{{longtable}}{{{col_spec}}}",
+            (rf"\caption{{{caption_tex}}}\\ \hline" if caption else r"\hline"),
+            header,
+            r"\endfirsthead",
+            (rf"\caption[]{{{caption_tex} (continuación)}}\\ \hline" if caption else r"\hline"),
+            header,
+            r"\endhead",
+            rf"\multicolumn{{{n_cols}}}{{r}}{{\textit{{Continúa en la siguiente página}}}}\\",
+            r"\endfoot",
+            r"\endlastfoot",
+            body,
+            r"\end{longtable}",
+        ]
+        tex = "\n".join(parts)
+        if self.two_column:
+            # longtable no funciona en modo twocolumn
+            tex = "\\onecolumn\n" + tex + "\n\\twocolumn"
+        self._append_tex(tex)
 
     # ================== LISTAS ==================
     def add_itemize(self, items):
@@ -147,11 +414,11 @@ class Report:
 
     # ================== CÓDIGO ==================
     def add_code(self, code, language="python"):
-        self.doc.append(NoEscape(rf"""
+        self._append_tex(rf"""
     \begin{{lstlisting}}[language={language}]
     {code}
     \end{{lstlisting}}
-    """))
+    """)
 
 
     # ================== MULTICOLUMNAS ==================
@@ -172,11 +439,99 @@ class Report:
 {escape_latex(content)}
 \end{{tcolorbox}}
 """
-        self.doc.append(NoEscape(box))
+        self._append_tex(box)
 
     # ================== GRÁFICO ==================
-    def add_plot(self, x, y, caption=""):
+    def _write_series(self, x, y):
+        """Guarda una serie en data/*.dat (nombre por contenido) para `\addplot table`."""
+        data = np.column_stack([x, y])
+        digest = hashlib.sha1(data.tobytes()).hexdigest()[:12]
+        data_dir = os.path.join(self.outdir, "data")
+        os.makedirs(data_dir, exist_ok=True)
+        name = f"series-{digest}.dat"
+        target = os.path.join(data_dir, name)
+        if not os.path.exists(target):
+            buffer = io.BytesIO()
+            np.savetxt(buffer, data, fmt="%.10g", header="x y", comments="")
+            # build_reports puede compartir outdir: nunca se lee un .dat a medias
+            _write_atomic(target, buffer.getvalue())
+        return f"data/{name}"
+
+    def _series_tex(self, x, y, max_points=None, downsample="lttb", external=False):
+        """
+        `\addplot` de una serie: coordenadas inline (series pequeñas) o tabla
+        externa .dat, con downsampling opcional a `max_points`.
+        """
+        if not hasattr(x, "__len__") or not hasattr(y, "__len__"):
+            x, y = list(x), list(y)
+        n = min(len(x), len(y))
+        if (max_points and n > max_points) or external or (external is None and n > _INLINE_POINTS):
+            x, y = _as_series(x, y)
+            if max_points and len(x) > max_points:
+                x, y = _downsample(x, y, max_points, downsample)
+        if external is None:
+            external = len(x) > _INLINE_POINTS
+        if external:
+            return rf"\addplot table {{{self._write_series(x, y)}}};"
         coords = " ".join(f"({xi},{yi})" for xi, yi in zip(x, y))
+        return rf"\addplot coordinates {{{coords}}};"
+
+    def _raster_tex(self, series, dpi=300):
+        """
+        Dibuja las series con matplotlib en un PNG sin ejes y lo coloca dentro
+        del eje con `\addplot graphics`: ejes y etiquetas siguen siendo vectoriales.
+        Devuelve (addplot, opciones de límites del eje).
+        """
+        from matplotlib.figure import Figure as MplFigure
+
+        series = [s for s in (_as_series(x, y) for x, y in series) if len(s[0])]
+        if not series:
+            # nada que rasterizar: eje vacío, igual que `_series_tex` con una serie vacía
+            return r"\addplot coordinates {};", ""
+        # min/max por columna de píxeles: mismo dibujo, muchos menos segmentos
+        pixels = int(6 * dpi)
+        series = [
+            _downsample(x, y, 4 * pixels, "minmax") if not np.any(np.diff(x) < 0) else (x, y)
+            for x, y in series
+        ]
+        xs = np.concatenate([x for x, _ in series])
+        ys = np.concatenate([y for _, y in series])
+        xmin, xmax = float(xs.min()), float(xs.max())
+        ymin, ymax = float(ys.min()), float(ys.max())
+        if xmin == xmax:
+            xmin, xmax = xmin - 0.5, xmax + 0.5
+        if ymin == ymax:
+            ymin, ymax = ymin - 0.5, ymax + 0.5
+
+        fig = MplFigure(figsize=(6, 3))
+        ax = fig.add_axes([0, 0, 1, 1])
+        ax.set_axis_off()
+        for x, y in series:
+            ax.plot(x, y, linewidth=0.6)
+        ax.set_xlim(xmin, xmax)
+        ax.set_ylim(ymin, ymax)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png", dpi=dpi, transparent=True)
+        png = buffer.getvalue()
+        name = f"raster-{hashlib.sha1(png).hexdigest()[:12]}.png"
+        _write_atomic(os.path.join(self.images_dir, name), png)
+
+        limits = (f"xmin={xmin:.10g}, xmax={xmax:.10g}, ymin={ymin:.10g}, ymax={ymax:.10g},\n"
+                  "    enlargelimits=false,\n    axis on top,\n    ")
+        return rf"\addplot graphics[xmin={xmin:.10g}, xmax={xmax:.10g}, ymin={ymin:.10g}, ymax={ymax:.10g}] {{{name}}};", limits
+
+    def add_plot(self, x, y, caption="", max_points=None, downsample="lttb", external=False, raster=False):
+        """
+        max_points: reduce la serie a ese número de puntos ('lttb' o 'minmax').
+        external: escribe la serie en un .dat y la lee con `\addplot table`
+            (None => automático a partir de 1000 puntos; por defecto inline).
+        raster: dibuja la serie como PNG dentro del eje (series muy densas).
+        """
+        limits = ""
+        if raster:
+            series, limits = self._raster_tex([(x, y)])
+        else:
+            series = self._series_tex(x, y, max_points, downsample, external)
         plot = rf"""
 \begin{{figure}}[H]
 \centering
@@ -184,22 +539,24 @@ class Report:
 \begin{{axis}}[
     width=0.85\linewidth,
     height=6cm,
-    grid=major
+    {limits}grid=major
 ]
-\addplot coordinates {{{coords}}};
+{series}
 \end{{axis}}
 \end{{tikzpicture}}
 \caption{{{escape_latex(caption)}}}
 \end{{figure}}
 """
-        self.doc.append(NoEscape(plot))
+        self._append_tex(plot)
 
     # ================== MULTIPLOT ==================
-    def add_multiplot(self, plots, caption=""):
-        body = ""
-        for x, y in plots:
-            coords = " ".join(f"({xi},{yi})" for xi, yi in zip(x, y))
-            body += rf"\addplot coordinates {{{coords}}};"
+    def add_multiplot(self, plots, caption="", max_points=None, downsample="lttb", external=False, raster=False):
+        """Varias series en un mismo eje. Mismas opciones que `add_plot`."""
+        limits = ""
+        if raster:
+            body, limits = self._raster_tex(plots)
+        else:
+            body = "".join(self._series_tex(x, y, max_points, downsample, external) for x, y in plots)
 
         tex = rf"""
 \begin{{figure}}[H]
@@ -208,7 +565,7 @@ class Report:
 \begin{{axis}}[
     width=0.9\linewidth,
     height=6cm,
-    grid=both
+    {limits}grid=both
 ]
 {body}
 \end{{axis}}
@@ -216,24 +573,279 @@ class Report:
 \caption{{{escape_latex(caption)}}}
 \end{{figure}}
 """
-        self.doc.append(NoEscape(tex))
+        self._append_tex(tex)
 
     # ================== SALTO DE PÁGINA ==================
     def new_page(self):
         self.doc.append(NoEscape(r"\newpage"))
 
+    # ================== STREAMING ==================
+    def stream(self, filename="reporte_final", spool_bytes=32768, buffer_bytes=1 << 20):
+        """
+        Activa el modo streaming para reportes muy largos.
+
+        Cada elemento de primer nivel (una sección al cerrar su `with`, un
+        salto de página...) se escribe a `outdir/<filename>.body.tex` en cuanto
+        se agrega y se descarta de memoria. Los bloques grandes (tablas,
+        gráficos, código) de más de `spool_bytes` se escriben a
+        `<filename>.parts/` al crearse y se incluyen con `\input`, así que
+        tampoco crecen las secciones abiertas. `build()` compila un .tex
+        principal con el preámbulo y un `\input` del cuerpo.
+        """
+        self._stream_body = os.path.join(self.outdir, filename + ".body.tex")
+        self._stream_parts = os.path.join(self.outdir, filename + ".parts")
+        self._stream_spool_bytes = spool_bytes
+        self._stream_buffer_bytes = buffer_bytes
+        self._stream_buffer = []
+        self._stream_buffered = 0
+        self._stream_count = 0
+        self._stream_refs = set()
+        self._stream_xrefs = False
+        self._stream_largest = []
+        self._stream_seen = 0
+        self._stream_unicode = set()
+        shutil.rmtree(self._stream_parts, ignore_errors=True)
+        os.makedirs(self._stream_parts)
+        open(self._stream_body, "w", encoding="utf-8").close()
+
+        pending = list(self.doc.data)
+        self.doc.data = _TexSpool(self)
+        self.doc.real_data = self.doc.data
+        for item in pending:
+            self.doc.data.append(item)
+        return self
+
+    def _append_tex(self, tex):
+        """Agrega LaTeX crudo; en streaming, los bloques grandes van a un archivo aparte."""
+        if self._stream_body is None or len(tex) < self._stream_spool_bytes:
+            self.doc.append(NoEscape(tex))
+            return
+        self._stream_count += 1
+        name = f"{self._stream_count:06d}.tex"
+        self._scan_stream(tex, "part")
+        _write_atomic(os.path.join(self._stream_parts, name), tex.encode("utf-8"))
+        rel = os.path.relpath(os.path.join(self._stream_parts, name), self.outdir).replace(os.sep, "/")
+        self.doc.append(NoEscape(rf"\input{{{rel}}}"))
+
+    def _spool(self, item):
+        """Escribe un elemento de primer nivel al cuerpo del documento."""
+        if isinstance(item, LatexObject):
+            # los paquetes que pide el elemento se conservan para el preámbulo
+            if isinstance(item, Container):
+                item._propagate_packages()
+            for p in item.packages:
+                self.doc.packages.add(p)
+        code = dumps_list([item], escape=self.doc.escape) + self.doc.content_separator
+        # NoEscape y otros str tienen str.title: sólo las secciones tienen título
+        title = item.title if isinstance(item, (Section, Subsection)) else None
+        self._scan_stream(code, type(item).__name__, title)
+        self._stream_buffer.append(code)
+        self._stream_buffered += len(code)
+        if self._stream_buffered >= self._stream_buffer_bytes:
+            self._flush_stream()
+
+    def _scan_stream(self, code, kind, title=None):
+        """Guarda lo que build() necesita del texto que ya no está en memoria."""
+        for regex in (_INCLUDEGRAPHICS_RE, _PLOT_FILE_RE, _INPUT_RE):
+            self._stream_refs.update(m.group(0) for m in regex.finditer(code))
+        self._stream_xrefs = self._stream_xrefs or bool(_XREF_RE.search(code))
+        self._stream_unicode.update(_NON_PDFLATEX_RE.findall(code))
+        caption = _CAPTION_RE.search(code)
+        element = {
+            "type": kind,
+            "section": str(title) if title is not None else None,
+            "caption": caption.group(1)[:60] if caption else None,
+            "bytes": len(code.encode("utf-8")),
+        }
+        # sólo los 10 más grandes (memoria constante)
+        self._stream_seen += 1
+        entry = (element["bytes"], self._stream_seen, element)
+        if len(self._stream_largest) < 10:
+            heapq.heappush(self._stream_largest, entry)
+        else:
+            heapq.heappushpop(self._stream_largest, entry)
+
+    def _flush_stream(self):
+        if self._stream_buffer:
+            with open(self._stream_body, "a", encoding="utf-8") as f:
+                f.writelines(self._stream_buffer)
+            self._stream_buffer = []
+            self._stream_buffered = 0
+
+    def _dumps(self):
+        """El .tex completo (o, en streaming, el preámbulo con un \input del cuerpo)."""
+        if self._stream_body is None:
+            return self.doc.dumps()
+        self._flush_stream()
+        rel = os.path.relpath(self._stream_body, self.outdir).replace(os.sep, "/")
+        spool = self.doc.data
+        self.doc.data = [NoEscape(rf"\input{{{rel}}}")]
+        try:
+            return self.doc.dumps()
+        finally:
+            self.doc.data = spool
+
     # ================== BUILD ==================
-    def build(self, filename="reporte_final"):
+    def _referenced_files(self, tex):
+        """Archivos externos que usa el .tex (imágenes, \input, tablas de datos)."""
+        if self._stream_body is not None:
+            # referencias del contenido que ya se escribió a disco
+            tex = tex + "\n" + "\n".join(sorted(self._stream_refs))
+        files = []
+        for name in _INCLUDEGRAPHICS_RE.findall(tex):
+            candidates = [os.path.join(self.images_dir, name), os.path.join(self.outdir, name)]
+            if not os.path.splitext(name)[1]:
+                candidates = [c + ext for c in candidates for ext in _GRAPHICS_EXTENSIONS]
+            files.extend(c for c in candidates if os.path.isfile(c))
+        for kind, name in _PLOT_FILE_RE.findall(tex):
+            base = self.images_dir if kind == "graphics" else self.outdir
+            candidate = os.path.join(base, name)
+            if os.path.isfile(candidate):
+                files.append(candidate)
+        for name in _INPUT_RE.findall(tex):
+            candidate = os.path.join(self.outdir, name)
+            if os.path.isfile(candidate):
+                files.append(candidate)
+            elif os.path.isfile(candidate + ".tex"):
+                files.append(candidate + ".tex")
+        return sorted(set(files))
+
+    def _build_hash(self, tex, compiler):
+        h = hashlib.sha256()
+        h.update(compiler.encode())
+        h.update(tex.encode("utf-8"))
+        for f in self._referenced_files(tex):
+            h.update(os.path.relpath(f, self.outdir).encode())
+            h.update(_file_digest(f))
+        return h.hexdigest()
+
+    def build(self, filename="reporte_final", cache=True, max_passes=4, precompile=False, isolated=False,
+              report_json=None, compiler="pdflatex"):
+        """
+        Genera el PDF.
+
+        cache: si el .tex y los archivos que referencia (imágenes, etc.) no
+            cambiaron desde el último build, no se compila.
+        max_passes: límite de pasadas de pdflatex. Los .aux/.toc se conservan
+            entre builds, así que sólo se repite una pasada si cambian.
+        precompile: carga los paquetes del preámbulo desde un formato .fmt
+            precompilado (cacheado por lista de paquetes y opciones).
+        isolated: compila en un directorio temporal propio y mueve el resultado
+            a `outdir` al terminar (permite compilar varios reportes a la vez).
+        report_json: ruta opcional donde guardar la telemetría en JSON.
+        compiler: "pdflatex" (por defecto), "lualatex", "xelatex", "latexmk",
+            "tectonic" o "auto" (opcional: el más rápido instalado que soporte
+            el documento; la primera vez compila un documento de prueba con
+            cada motor y guarda los tiempos en compilers.json). Con "auto", los
+            documentos con caracteres fuera del alcance de inputenc prefieren
+            un motor Unicode; con pdflatex esos caracteres se muestran como "?"
+            en vez de romper el build.
+
+        Devuelve un `BuildReport` (también en `self.last_build`) con los
+        tiempos de ensamblado y de cada pasada, la memoria de TeX, los avisos
+        overfull/underfull y los elementos que más bytes aportan al .tex.
+        Si la compilación falla, `self.last_build` queda con status="error".
+        """
         path = os.path.join(self.outdir, filename)
+        t0 = time.perf_counter()
+        self.render_figures()
+        tex = self._dumps()
+        assembly_seconds = time.perf_counter() - t0
+
+        unicode_chars = set(_NON_PDFLATEX_RE.findall(tex))
+        if self._stream_body is not None:
+            unicode_chars |= self._stream_unicode
+        if compiler == "auto":
+            compiler = _select_compiler(tex, unicode_chars, precompile)
+        elif compiler not in _COMPILERS:
+            raise ValueError(f"[ViewX] Compilador no soportado: {compiler!r} (opciones: {', '.join(_COMPILERS)})")
+        if unicode_chars and not _COMPILERS[compiler]["unicode"]:
+            print(f"[ViewX] ⚠️ {compiler} no soporta {''.join(sorted(unicode_chars))[:20]!r}: "
+                  "se muestran como '?' (usa xelatex/lualatex)")
+        tex = _engine_tex(tex, compiler, unicode_chars)
+
+        build_hash = self._build_hash(tex, compiler)
+        hash_file = path + ".buildhash"
+        if cache and os.path.exists(path + ".pdf") and _read_text(hash_file) == build_hash:
+            self.last_build = BuildReport(
+                pdf=path + ".pdf", status="ok", cached=True, compiler=compiler, passes=0, pass_seconds=[],
+                assembly_seconds=assembly_seconds, compile_seconds=0.0,
+                total_seconds=time.perf_counter() - t0,
+            )
+            print(f"[ViewX] ⚡ Sin cambios, se reutiliza: {path}.pdf")
+            if report_json:
+                self.last_build.to_json(report_json)
+            return self.last_build
+
+        # "out/reporte": el .tex, el PDF y los auxiliares van a outdir/out,
+        # pero se compila desde outdir para que las rutas relativas sigan valiendo
+        subdir, jobname = os.path.split(filename)
+        output_dir = subdir or "."
+        os.makedirs(os.path.join(self.outdir, subdir), exist_ok=True)
+        workdir = self.outdir
+        if isolated:
+            workdir = tempfile.mkdtemp(prefix=f".{jobname}-", dir=self.outdir)
+            output_dir = "."
+            # conservar el estado de referencias del build anterior
+            for ext in _AUX_EXTENSIONS:
+                if os.path.exists(path + ext):
+                    shutil.copy2(path + ext, os.path.join(workdir, jobname + ext))
+        work_path = os.path.join(workdir, output_dir, jobname)
+
         try:
-            self.doc.generate_pdf(
-                filepath=path,
-                clean_tex=False,
-                compiler="pdflatex"
+            # sólo reescribir el .tex si cambió (conserva mtime para herramientas externas)
+            if _read_text(work_path + ".tex") != tex:
+                with open(work_path + ".tex", "w", encoding="utf-8") as f:
+                    f.write(tex)
+            t1 = time.perf_counter()
+            # los formatos precompilados (mylatexformat) sólo se usan con pdflatex
+            fmt = _precompiled_format(compiler, tex) if precompile and compiler == "pdflatex" else None
+            format_seconds = time.perf_counter() - t1
+            pass_seconds = _run_latex(compiler, workdir, jobname, max_passes,
+                                      xrefs=self._has_xrefs(tex), fmt=fmt,
+                                      texinputs=os.path.abspath(self.outdir) if isolated else None,
+                                      output_dir=output_dir)
+            passes = len(pass_seconds)
+            compile_seconds = time.perf_counter() - t1 - format_seconds
+            log = _parse_latex_log(work_path + ".log")
+            if isolated:
+                # el PDF se mueve al final: en outdir nunca hay un PDF a medio escribir
+                for ext in (".tex",) + _AUX_EXTENSIONS + (".pdf",):
+                    if os.path.exists(work_path + ext):
+                        os.replace(work_path + ext, path + ext)
+            with open(hash_file, "w", encoding="utf-8") as f:
+                f.write(build_hash)
+
+            self.last_build = BuildReport(
+                pdf=path + ".pdf", status="ok", cached=False, compiler=compiler,
+                passes=passes, pass_seconds=pass_seconds,
+                assembly_seconds=assembly_seconds, compile_seconds=compile_seconds,
+                format=fmt, format_seconds=format_seconds,
+                total_seconds=time.perf_counter() - t0,
+                largest_elements=self._largest_elements(tex),
+                **log,
             )
-            print(f"[ViewX] ✅ PDF generado: {path}.pdf")
+            print(f"[ViewX] ✅ PDF generado: {path}.pdf "
+                  f"({passes} pasada{'s' if passes != 1 else ''}, {self.last_build['total_seconds']:.2f} s)")
+            if log["overfull"] or log["underfull"]:
+                print(f"[ViewX] ⚠️ {log['overfull']} overfull / {log['underfull']} underfull (ver {path}.log)")
+            if report_json:
+                self.last_build.to_json(report_json)
+            return self.last_build
 
         except Exception as e:
+            if os.path.exists(hash_file):
+                os.remove(hash_file)
+            self.last_build = BuildReport(
+                pdf=None, status="error", cached=False, compiler=compiler,
+                error=f"{type(e).__name__}: {e}",
+                assembly_seconds=assembly_seconds,
+                total_seconds=time.perf_counter() - t0,
+                largest_elements=self._largest_elements(tex),
+                **_parse_latex_log(work_path + ".log"),
+            )
+            if report_json:
+                self.last_build.to_json(report_json)
             print("[ViewX] ❌ Error LaTeX")
             print(f"👉 Revisa {path}.log")
 
@@ -243,4 +855,650 @@ class Report:
                     print(e.output.decode("latin-1"))
                 except:
                     pass
-            raise
\ No newline at end of file
+            raise
+
+        finally:
+            if isolated:
+                if os.path.exists(work_path + ".log"):
+                    os.replace(work_path + ".log", path + ".log")
+                shutil.rmtree(workdir, ignore_errors=True)
+
+    def _has_xrefs(self, tex):
+        return bool(_XREF_RE.search(tex)) or (self._stream_body is not None and self._stream_xrefs)
+
+    def _largest_elements(self, tex, top=10):
+        """Elementos (tablas, figuras, gráficos...) que más bytes emiten al .tex."""
+        elements = []
+
+        def walk(items, where):
+            for item in items:
+                if isinstance(item, (Section, Subsection)):
+                    walk(item.data, f"{where}/{item.title}" if where else str(item.title))
+                    continue
+                code = item.dumps() if hasattr(item, "dumps") else str(item)
+                caption = _CAPTION_RE.search(code)
+                elements.append({
+                    "type": type(item).__name__,
+                    "section": where or None,
+                    "caption": caption.group(1)[:60] if caption else None,
+                    "bytes": len(code.encode("utf-8")),
+                })
+
+        walk(self.doc.data, "")
+        if self._stream_body is not None:
+            elements.extend(entry[-1] for entry in self._stream_largest)
+        # los datos de los gráficos en archivos .dat externos también cuentan
+        for f in self._referenced_files(tex):
+            if f.endswith(".dat"):
+                elements.append({
+                    "type": "file", "section": None,
+                    "caption": os.path.relpath(f, self.outdir),
+                    "bytes": os.path.getsize(f),
+                })
+        return sorted(elements, key=lambda e: e["bytes"], reverse=True)[:top]
+
+    def benchmark(self, filename="benchmark", runs=3):
+        """
+        Compara el tiempo de compilación por reporte sin y con preámbulo
+        precompilado (sin caché de build). Devuelve los tiempos medios en segundos.
+        """
+        results = {}
+        for precompile in (False, True):
+            if precompile:
+                # el formato se genera una sola vez y no cuenta en la medición
+                _precompiled_format("pdflatex", self._dumps())
+            times = [self.build(filename, cache=False, precompile=precompile, compiler="pdflatex")["compile_seconds"]
+                     for _ in range(runs)]
+            results["precompiled" if precompile else "standard"] = sum(times) / len(times)
+        results["speedup"] = results["standard"] / results["precompiled"] if results["precompiled"] else None
+        print(f"[ViewX] ⏱️ pdflatex: {results['standard']:.2f} s → {results['precompiled']:.2f} s con preámbulo precompilado")
+        return results
+
+
+# ================== FIGURAS ==================
+def _init_figure_worker():
+    import matplotlib
+    matplotlib.use("Agg", force=True)
+
+
+# sin fecha ni versión en los metadatos: la misma figura da los mismos bytes
+_FIGURE_METADATA = {"pdf": {"CreationDate": None, "Producer": None}, "png": {"Software": None}}
+
+
+def _figure_bytes(fig, fmt, dpi):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, dpi=dpi, bbox_inches="tight", format=fmt, metadata=_FIGURE_METADATA[fmt])
+    return buffer.getvalue()
+
+
+def _write_atomic(path, data):
+    # se escribe a un temporal y se renombra: nunca queda un render a medias
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _render_figure(payload, path, dpi):
+    """Llama a la función que crea la figura y la renderiza en `path`."""
+    import matplotlib.pyplot as plt
+
+    fn, args, kwargs = payload
+    before = set(plt.get_fignums())
+    current = plt.gcf().number if before else None
+    # figura nueva como actual: una función que dibuja con plt.* no pinta
+    # sobre la figura de quien llama
+    plt.figure()
+    result = fn(*args, **kwargs)
+    if result is None:
+        fig = plt.gcf()
+    elif hasattr(result, "savefig"):
+        fig = result
+    else:
+        # Axes, FacetGrid/PairGrid de seaborn...
+        fig = getattr(result, "figure", None) or getattr(result, "fig", None) or plt.gcf()
+    _write_atomic(path, _figure_bytes(fig, os.path.splitext(path)[1][1:], dpi))
+    # se cierran sólo las figuras creadas aquí y se restaura la figura actual
+    for number in set(plt.get_fignums()) - before:
+        plt.close(number)
+    if current is not None:
+        plt.figure(current)
+    return path
+
+
+# ================== IMÁGENES ==================
+# (ruta, mtime, tamaño) -> hash de contenido, para no releer imágenes repetidas
+_IMAGE_DIGESTS = {}
+# ancho aproximado del texto en pulgadas (article + geometry por defecto)
+_TEXTWIDTH_IN = 5.95
+_COLUMNSEP_IN = 0.35
+_UNITS_IN = {"in": 1.0, "cm": 1 / 2.54, "mm": 1 / 25.4, "pt": 1 / 72.27, "bp": 1 / 72.0}
+_WIDTH_RE = re.compile(r"^\s*([0-9.]*)\s*(\\textwidth|\\linewidth|\\columnwidth|in|cm|mm|pt|bp)\s*$")
+
+
+def _latex_width_inches(width, two_column=False):
+    """Ancho físico aproximado de una longitud LaTeX, o None si no se reconoce."""
+    match = _WIDTH_RE.match(str(width))
+    if not match:
+        return None
+    factor = float(match.group(1)) if match.group(1) else 1.0
+    unit = match.group(2)
+    if unit in _UNITS_IN:
+        return factor * _UNITS_IN[unit]
+    if unit == "\\textwidth" or not two_column:
+        return factor * _TEXTWIDTH_IN
+    return factor * (_TEXTWIDTH_IN - _COLUMNSEP_IN) / 2
+
+
+# ================== TABLAS ==================
+# misma traducción que pylatex.utils.escape_latex, aplicada con str.translate
+_LATEX_TRANSLATION = str.maketrans({c: escape_latex(c) for c in "&%$#_{}~^\\\n\xa0[]-"})
+_CELL_SEP = "\x1f"
+
+
+def _format_column(series, fmt=None, float_format=None, max_width=None):
+    """Convierte una columna a texto (vectorizado cuando es posible)."""
+    missing = series.isna()
+    text = pd.Series("", index=series.index, dtype=object)
+    present = series[~missing]
+    if callable(fmt):
+        text[~missing] = present.map(fmt).astype(str)
+    elif fmt is not None or (float_format is not None and pd.api.types.is_float_dtype(series)):
+        text[~missing] = np.char.mod(fmt or float_format, present.to_numpy())
+    else:
+        text[~missing] = present.astype(str)
+    if max_width is not None:
+        too_long = text.str.len() > max_width
+        if too_long.any():
+            text = text.where(~too_long, text.str.slice(0, max(max_width - 3, 0)) + "...")
+    return text
+
+
+def _escape_column(text):
+    """Escapa toda una columna con un único `str.translate` sobre el texto unido."""
+    if not len(text):
+        return text
+    joined = _CELL_SEP.join(text.tolist()).translate(_LATEX_TRANSLATION)
+    return pd.Series(joined.split(_CELL_SEP), index=text.index)
+
+
+# ================== SERIES ==================
+# a partir de este número de puntos las series van a un .dat externo
+_INLINE_POINTS = 1000
+
+
+def _as_series(x, y):
+    """Convierte x, y a arrays float del mismo largo, sin NaN."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = min(len(x), len(y))
+    x, y = x[:n], y[:n]
+    valid = ~(np.isnan(x) | np.isnan(y))
+    return x[valid], y[valid]
+
+
+def _lttb(x, y, n_out):
+    """Índices elegidos por Largest-Triangle-Three-Buckets (x ordenado)."""
+    n = len(x)
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    a = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            avg_x, avg_y = x[stop:edges[i + 2]].mean(), y[stop:edges[i + 2]].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+        area = np.abs((x[a] - avg_x) * (y[start:stop] - y[a]) - (x[a] - x[start:stop]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        idx[i + 1] = a
+    return idx
+
+
+def _minmax(y, n_out):
+    """Índices del mínimo y máximo de cada cubeta consecutiva (conserva picos)."""
+    n = len(y)
+    # dos índices por cubeta más los extremos: como mucho n_out puntos
+    n_buckets = max(1, (n_out - 2) // 2)
+    edges = np.linspace(0, n, n_buckets + 1).astype(np.int64)
+    starts = edges[:-1]
+    bucket = np.repeat(np.arange(n_buckets), np.diff(edges))
+    keep = [np.array([0, n - 1])]
+    for reduced in (np.minimum.reduceat(y, starts), np.maximum.reduceat(y, starts)):
+        hits = np.flatnonzero(y == reduced[bucket])
+        _, first = np.unique(bucket[hits], return_index=True)
+        keep.append(hits[first])
+    return np.unique(np.concatenate(keep))
+
+
+def _downsample(x, y, max_points, method="lttb"):
+    if len(x) <= max_points:
+        return x, y
+    if method == "lttb":
+        if max_points < 3:
+            raise ValueError("max_points debe ser >= 3 para 'lttb'")
+        if np.any(np.diff(x) < 0):
+            order = np.argsort(x, kind="stable")
+            x, y = x[order], y[order]
+        idx = _lttb(x, y, max_points)
+    elif method == "minmax":
+        if max_points < 4:
+            raise ValueError("max_points debe ser >= 4 para 'minmax'")
+        idx = _minmax(y, max_points)
+    else:
+        raise ValueError(f"Downsampling '{method}' no soportado. Use 'lttb' o 'minmax'.")
+    return x[idx], y[idx]
+
+
+# ================== COMPILACIÓN ==================
+_INCLUDEGRAPHICS_RE = re.compile(r"\\includegraphics(?:\[[^\]]*\])?\{([^}]*)\}")
+_INPUT_RE = re.compile(r"\\(?:input|include)\{([^}]*)\}")
+_PLOT_FILE_RE = re.compile(r"\\addplot\+?\s*(table|graphics)\s*(?:\[[^\]]*\])?\s*\{([^}]*)\}")
+_GRAPHICS_EXTENSIONS = (".pdf", ".png", ".jpg", ".jpeg", ".eps")
+# comandos que leen el .aux/.toc de la pasada anterior
+_XREF_RE = re.compile(r"\\(?:ref|pageref|eqref|autoref|cref|cite|tableofcontents|listoffigures|listoftables)\b")
+# archivos auxiliares cuyo cambio obliga a otra pasada (referencias, índice, etc.)
+_AUX_EXTENSIONS = (".aux", ".toc", ".lof", ".lot", ".out")
+
+
+_ENDOFDUMP = r"\csname endofdump\endcsname"
+
+
+def _cache_dir(*parts):
+    """Directorio de caché de ViewX (VIEWX_CACHE_DIR o ~/.cache/viewx)."""
+    base = os.environ.get("VIEWX_CACHE_DIR") or os.path.join(
+        os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "viewx"
+    )
+    path = os.path.join(base, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+@functools.lru_cache(maxsize=None)
+def _tex_version(compiler):
+    try:
+        out = subprocess.run([compiler, "--version"], stdout=subprocess.PIPE, stderr=subprocess.STDOUT).stdout
+    except OSError:
+        return ""
+    return out.decode("latin-1").splitlines()[0] if out else ""
+
+
+def _precompiled_format(compiler, tex):
+    """
+    Devuelve la ruta (sin .fmt) de un formato con el preámbulo fijo de `tex`
+    ya cargado, generándolo con mylatexformat la primera vez. La clave es el
+    texto del preámbulo fijo (clase, paquetes y opciones) más la versión de TeX.
+    Si el formato no se puede generar devuelve None y se compila normalmente.
+    """
+    if _ENDOFDUMP not in tex:
+        return None
+    fixed = tex[:tex.index(_ENDOFDUMP)]
+    key = hashlib.sha256((compiler + "\0" + _tex_version(compiler) + "\0" + fixed).encode("utf-8")).hexdigest()[:16]
+    workdir = _cache_dir("latex-formats")
+    name = f"viewx-{compiler}-{key}"
+    fmt = os.path.join(workdir, name)
+    if os.path.exists(fmt + ".fmt"):
+        return fmt
+
+    # nombre temporal + os.replace: varios procesos pueden generar el mismo formato
+    tmp_name = f"{name}-{os.getpid()}"
+    tmp = os.path.join(workdir, tmp_name)
+    with open(tmp + ".tex", "w", encoding="utf-8") as f:
+        f.write(fixed + _ENDOFDUMP + "\n\\begin{document}\n\\end{document}\n")
+    command = [compiler, "-ini", "-interaction=nonstopmode", f"-jobname={tmp_name}",
+               f"&{compiler}", "mylatexformat.ltx", tmp_name + ".tex"]
+    try:
+        proc = subprocess.run(command, cwd=workdir, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    except OSError:
+        return None
+    if proc.returncode != 0 or not os.path.exists(tmp + ".fmt"):
+        print(f"[ViewX] ⚠️ No se pudo precompilar el preámbulo (¿falta mylatexformat?). Revisa {tmp}.log")
+        return None
+    os.replace(tmp + ".fmt", fmt + ".fmt")
+    for ext in (".tex", ".log"):
+        if os.path.exists(tmp + ext):
+            os.remove(tmp + ext)
+    print(f"[ViewX] 🧩 Preámbulo precompilado: {fmt}.fmt")
+    return fmt
+
+
+def _file_digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.digest()
+
+
+def _read_text(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def _aux_state(workdir, jobname):
+    state = {}
+    for ext in _AUX_EXTENSIONS:
+        f = os.path.join(workdir, jobname + ext)
+        if os.path.exists(f):
+            state[ext] = _file_digest(f)
+    return state
+
+
+# ================== COMPILADORES ==================
+# unicode: motor UTF-8 nativo (fontspec en lugar de inputenc/fontenc)
+# self_passes: el backend decide y repite las pasadas por su cuenta
+_COMPILERS = {
+    "pdflatex": {"unicode": False, "self_passes": False},
+    "lualatex": {"unicode": True, "self_passes": False},
+    "xelatex": {"unicode": True, "self_passes": False},
+    "latexmk": {"unicode": False, "self_passes": True},
+    "tectonic": {"unicode": True, "self_passes": True},
+}
+# lo que pdflatex + inputenc/textcomp cubre: latín extendido, puntuación, monedas, símbolos de letras
+_NON_PDFLATEX_RE = re.compile("[^\u0000-\u024f\u2000-\u206f\u20a0-\u20cf\u2100-\u214f]")
+_ENCODING_PACKAGES_RE = re.compile(r"^\\usepackage\[(?:T1|utf8)\]\{(?:fontenc|inputenc)\}%?\n", re.M)
+
+
+def available_compilers():
+    """Backends de compilación instalados (en orden de preferencia)."""
+    return [name for name in _COMPILERS if shutil.which(name)]
+
+
+def _engine_tex(tex, compiler, unicode_chars=()):
+    """Adapta el .tex al motor: fontspec en motores Unicode, sustitutos en pdflatex."""
+    if _COMPILERS[compiler]["unicode"]:
+        tex = _ENCODING_PACKAGES_RE.sub("", tex)
+        end = tex.index("\n") + 1
+        return tex[:end] + "\\usepackage{fontspec}%\n" + tex[end:]
+    if unicode_chars:
+        # inputenc aborta con caracteres que no conoce: se muestran como "?"
+        decls = "".join(rf"\DeclareUnicodeCharacter{{{ord(c):04X}}}{{\textbf{{?}}}}%" + "\n"
+                        for c in sorted(unicode_chars))
+        # al final del preámbulo (después del formato precompilado, si lo hay)
+        i = tex.index("\\begin{document}")
+        tex = tex[:i] + decls + tex[i:]
+    return tex
+
+
+def _compiler_command(compiler, jobname, max_passes=4, fmt=None, texinputs=None, output_dir=None):
+    source = os.path.join(output_dir, jobname + ".tex") if output_dir else jobname + ".tex"
+    if compiler == "latexmk":
+        command = ["latexmk", "-pdf", "-interaction=nonstopmode", "-halt-on-error",
+                   "-e", f"$max_repeat={max_passes}"]
+        if output_dir:
+            command.append("-outdir=" + output_dir)
+        return command + [source]
+    if compiler == "tectonic":
+        command = ["tectonic", "--keep-logs", "--keep-intermediates"]
+        if texinputs:
+            command += ["-Z", f"search-path={texinputs}"]
+        if output_dir:
+            command += ["-o", output_dir]
+        return command + [source]
+    command = [compiler, "-interaction=nonstopmode", "-halt-on-error"]
+    if fmt:
+        command.append("-fmt=" + os.path.basename(fmt))
+    if output_dir:
+        command.append("-output-directory=" + output_dir)
+    return command + [source]
+
+
+def _compiler_timings(candidates, tex, unicode_chars=()):
+    """
+    Tiempo de compilación de cada backend con el preámbulo del documento.
+    Se mide una vez por preámbulo y versión del compilador (tras una pasada
+    de calentamiento) y se guarda en la caché de ViewX.
+    """
+    preamble = tex[:tex.index("\\begin{document}")]
+    cache_file = os.path.join(_cache_dir(), "compilers.json")
+    try:
+        with open(cache_file, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        cached = {}
+
+    timings, measured = {}, {}
+    for compiler in candidates:
+        key = hashlib.sha256(
+            (compiler + "\0" + _tex_version(compiler) + "\0" + preamble).encode("utf-8")
+        ).hexdigest()[:16]
+        if key in cached:
+            timings[compiler] = cached[key]
+            continue
+        probe = _engine_tex(preamble + "\\begin{document}\nViewX\n\\end{document}\n", compiler, unicode_chars)
+        with tempfile.TemporaryDirectory(prefix="viewx-probe-") as workdir:
+            seconds = None
+            try:
+                # dos jobs distintos: latexmk/tectonic no recompilan un job al día
+                for job in ("warmup", "probe"):
+                    with open(os.path.join(workdir, job + ".tex"), "w", encoding="utf-8") as f:
+                        f.write(probe)
+                    seconds = sum(_run_latex(compiler, workdir, job, max_passes=1, xrefs=False))
+            except (subprocess.CalledProcessError, OSError):
+                seconds = None  # el backend no puede con este preámbulo
+        timings[compiler] = measured[key] = seconds
+
+    if measured:
+        cached.update(measured)
+        tmp = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(cached, f, indent=2)
+        os.replace(tmp, cache_file)
+        print("[ViewX] ⏱️ Compiladores: " + ", ".join(
+            f"{c} {t:.2f} s" if t is not None else f"{c} ✗" for c, t in timings.items()))
+    return timings
+
+
+def _select_compiler(tex, unicode_chars=(), precompile=False):
+    """El backend instalado más rápido que soporta el documento."""
+    available = available_compilers()
+    if not available:
+        return "pdflatex"  # falla con el error habitual de compilador no encontrado
+    if precompile and "pdflatex" in available:
+        return "pdflatex"
+    candidates = available
+    if unicode_chars:
+        # pdflatex/latexmk quedan como último recurso (con sustitutos "?")
+        candidates = [c for c in available if _COMPILERS[c]["unicode"]] or available
+    if len(candidates) == 1:
+        return candidates[0]
+    timings = _compiler_timings(candidates, tex, unicode_chars)
+    usable = [c for c in candidates if timings.get(c) is not None]
+    return min(usable, key=timings.get) if usable else candidates[0]
+
+
+def _run_latex(compiler, workdir, jobname, max_passes=4, xrefs=True, fmt=None, texinputs=None, output_dir=None):
+    """
+    Compila `jobname.tex` en `workdir` repitiendo pasadas sólo mientras
+    cambien los archivos auxiliares y el documento los consuma (xrefs) o
+    LaTeX pida explícitamente otra pasada. Devuelve la duración de cada pasada.
+    compiler: uno de `_COMPILERS`; latexmk y tectonic hacen sus propias pasadas.
+    fmt: ruta (sin extensión) de un formato precompilado (sólo pdflatex).
+    texinputs: directorio extra donde buscar imágenes e \\input (builds aislados).
+    output_dir: directorio (relativo a `workdir`) del .tex y de lo que genera.
+    """
+    command = _compiler_command(compiler, jobname, max_passes, fmt, texinputs, output_dir)
+    aux_dir = os.path.join(workdir, output_dir) if output_dir else workdir
+    env = dict(os.environ)
+    if fmt:
+        env["TEXFORMATS"] = os.path.dirname(fmt) + os.pathsep
+    if texinputs:
+        # el separador final conserva las rutas por defecto de kpathsea
+        env["TEXINPUTS"] = texinputs + os.pathsep + env.get("TEXINPUTS", "")
+
+    if _COMPILERS[compiler]["self_passes"]:
+        t0 = time.perf_counter()
+        proc = subprocess.run(command, cwd=workdir, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        elapsed = time.perf_counter() - t0
+        if proc.returncode != 0:
+            raise subprocess.CalledProcessError(proc.returncode, command, output=proc.stdout)
+        if compiler == "latexmk":
+            runs = proc.stdout.count(b"Run number")
+        else:
+            runs = 1 + proc.stdout.count(b"Rerunning")
+        # el backend no informa la duración de cada pasada: se reparte por igual
+        runs = max(runs, 1)
+        return [elapsed / runs] * runs
+
+    pass_seconds = []
+    while len(pass_seconds) < max_passes:
+        before = _aux_state(aux_dir, jobname)
+        t0 = time.perf_counter()
+        proc = subprocess.run(command, cwd=workdir, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        pass_seconds.append(time.perf_counter() - t0)
+        if proc.returncode != 0:
+            raise subprocess.CalledProcessError(proc.returncode, command, output=proc.stdout)
+        if _aux_state(aux_dir, jobname) == before:
+            break
+        if not xrefs and b"Rerun" not in proc.stdout:
+            break
+    return pass_seconds
+
+
+# ================== STREAMING ==================
+class _TexSpool(list):
+    """`doc.data` en modo streaming: lo que se agrega se escribe a disco."""
+
+    def __init__(self, report):
+        super().__init__()
+        self.report = report
+
+    def append(self, item):
+        self.report._spool(item)
+
+    def extend(self, items):
+        for item in items:
+            self.report._spool(item)
+
+
+# ================== TELEMETRÍA ==================
+_CAPTION_RE = re.compile(r"\\caption\{(.*?)\}")
+_OVERFULL_RE = re.compile(rb"^Overfull \\[hv]box", re.M)
+_UNDERFULL_RE = re.compile(rb"^Underfull \\[hv]box", re.M)
+_TEX_ERROR_RE = re.compile(rb"^! (.*)$", re.M)
+# " 5443 strings out of 478287", " 72i,8n,76p,416b,391s stack positions out of 10000i,..."
+_TEX_MEMORY_RE = re.compile(rb"^ ?(\S+) ([A-Za-z][A-Za-z ]+?)(?: for \d+ fonts)?,? out of (\S+)", re.M)
+
+
+class BuildReport(dict):
+    """
+    Telemetría de un `Report.build`. Es un dict (compatible con el resultado
+    anterior de build) con acceso por atributo y exportación a JSON.
+    """
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def to_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self, f, indent=2, ensure_ascii=False, default=str)
+        return path
+
+    def summary(self):
+        lines = [
+            f"status: {self.get('status')}  pasadas: {self.get('passes', 0)}  total: {self.get('total_seconds', 0):.2f} s",
+            f"ensamblado Python: {self.get('assembly_seconds', 0):.3f} s",
+        ]
+        for i, seconds in enumerate(self.get("pass_seconds") or [], 1):
+            lines.append(f"pasada {i}: {seconds:.3f} s")
+        if "overfull" in self:
+            lines.append(f"overfull: {self['overfull']}  underfull: {self['underfull']}")
+        for key, usage in (self.get("tex_memory") or {}).items():
+            lines.append(f"memoria TeX {key}: {usage['used']} de {usage['max']}")
+        for e in self.get("largest_elements") or []:
+            lines.append(f"{e['bytes']:>10} B  {e['type']}  {e['caption'] or ''}")
+        return "\n".join(lines)
+
+
+def _parse_latex_log(log_path):
+    """Avisos, errores y estadísticas de memoria del .log de LaTeX."""
+    info = {"log": log_path, "overfull": 0, "underfull": 0, "errors": [], "tex_memory": {}}
+    try:
+        with open(log_path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return info
+    info["overfull"] = len(_OVERFULL_RE.findall(data))
+    info["underfull"] = len(_UNDERFULL_RE.findall(data))
+    info["errors"] = [m.decode("latin-1") for m in _TEX_ERROR_RE.findall(data)]
+    # el bloque de memoria se repite en cada pasada; basta con el último
+    start = data.rfind(b"Here is how much of TeX's memory you used:")
+    if start >= 0:
+        for used, key, maximum in _TEX_MEMORY_RE.findall(data[start:]):
+            info["tex_memory"][key.decode().strip()] = {"used": used.decode(), "max": maximum.decode()}
+    return info
+
+
+# ================== BATCH ==================
+def _build_job(filename, builder, build_kwargs):
+    """Construye y compila un reporte en un proceso del pool."""
+    t0 = time.perf_counter()
+    job = {"filename": filename, "status": "ok", "error": None}
+    report = None
+    try:
+        report = builder if isinstance(builder, Report) else builder()
+        job["builder_seconds"] = time.perf_counter() - t0
+        job.update(report.build(filename, isolated=True, **build_kwargs))
+    except Exception as e:
+        job["status"] = "error"
+        job["error"] = f"{type(e).__name__}: {e}"
+        if report is not None and getattr(report, "last_build", {}).get("status") == "error":
+            job["tex_errors"] = report.last_build["errors"]
+    if report is not None:
+        job["log"] = os.path.join(report.outdir, filename + ".log")
+    job["job_seconds"] = time.perf_counter() - t0
+    return job
+
+
+def build_reports(jobs, workers=None, manifest=None, **build_kwargs):
+    """
+    Compila muchos reportes en paralelo (un proceso por reporte).
+
+    jobs: dict {filename: builder} o lista de pares (filename, builder), donde
+        builder es un Report o una función (importable) que devuelve un Report.
+    workers: número de procesos (por defecto, núcleos disponibles).
+    manifest: ruta opcional donde guardar el manifiesto en JSON.
+    build_kwargs: se pasan a `Report.build` (cache, precompile, max_passes...).
+
+    Cada reporte compila en su propio directorio temporal y el PDF se mueve
+    de forma atómica a su `outdir`. Devuelve el manifiesto (estado, error,
+    log y tiempos por trabajo).
+    """
+    items = list(jobs.items()) if isinstance(jobs, dict) else list(jobs)
+    names = [name for name, _ in items]
+    duplicated = {n for n in names if names.count(n) > 1}
+    if duplicated:
+        raise ValueError(f"[ViewX] Nombres de archivo repetidos en el batch: {sorted(duplicated)}")
+
+    t0 = time.perf_counter()
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_build_job, name, builder, build_kwargs): name for name, builder in items}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                # fallo del propio worker (p. ej. builder no serializable)
+                results[name] = {"filename": name, "status": "error", "error": f"{type(e).__name__}: {e}"}
+
+    jobs_out = [results[name] for name in names]
+    summary = {
+        "total_seconds": time.perf_counter() - t0,
+        "ok": sum(j["status"] == "ok" for j in jobs_out),
+        "failed": sum(j["status"] != "ok" for j in jobs_out),
+        "jobs": jobs_out,
+    }
+    if manifest:
+        with open(manifest, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+    print(f"[ViewX] 📚 Batch: {summary['ok']} PDF(s) generados, {summary['failed']} con error "
+          f"({summary['total_seconds']:.2f} s)")
+    return summary